@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
+from urllib.parse import urljoin
 
 from django.db.models import Q
 import django_filters
@@ -11,37 +12,63 @@ from rest_framework.schemas import ManualSchema
 import six
 
 from calculator import models as calc_models
+from calculator.snapshot import (
+    get_data_version, get_units, get_modifier_types, snapshot
+)
 
 logger = logging.getLogger('laa-calc')
 
 
-class CalculatorSchema(ManualSchema):
+@snapshot
+def get_calculator_count_fields():
+    fields = []
+    for unit in get_units().values():
+        fields.append(
+            coreapi.Field(unit.pk.lower(), **{
+                'required': False,
+                'location': 'query',
+                'type': 'number',
+                'description': (
+                    'Quantity of the price unit: {}'.format(unit.name)
+                ),
+            }),
+        )
+
+    for modifier in get_modifier_types().values():
+        fields.append(
+            coreapi.Field(modifier.name.lower(), **{
+                'required': False,
+                'location': 'query',
+                'type': 'number',
+                'description': (
+                    'Price modifier: {}'.format(modifier.description)
+                )
+            }),
+        )
+    return fields
 
-    def __init__(self, fields, *args, **kwargs):
-        for unit in calc_models.Unit.objects.all():
-            fields.append(
-                coreapi.Field(unit.pk.lower(), **{
-                    'required': False,
-                    'location': 'query',
-                    'type': 'number',
-                    'description': (
-                        'Quantity of the price unit: {}'.format(unit.name)
-                    ),
-                }),
-            )
-
-        for modifier in calc_models.ModifierType.objects.all():
-            fields.append(
-                coreapi.Field(modifier.name.lower(), **{
-                    'required': False,
-                    'location': 'query',
-                    'type': 'number',
-                    'description': (
-                        'Price modifier: {}'.format(modifier.description)
-                    )
-                }),
-            )
-        super().__init__(fields, *args, **kwargs)
+
+class CalculatorSchema(ManualSchema):
+    """
+    The given fields plus a field for each unit and modifier type, which are
+    looked up when the schema is generated rather than when it is created,
+    and again whenever the scheme data changes
+    """
+
+    def get_link(self, path, method, base_url):
+        # clears the snapshots if the data has changed since the last check
+        get_data_version()
+
+        if base_url and path.startswith('/'):
+            path = path[1:]
+
+        return coreapi.Link(
+            url=urljoin(base_url, path),
+            action=method.lower(),
+            encoding=self._encoding,
+            fields=self._fields + get_calculator_count_fields(),
+            description=self._description
+        )
 
 
 class ModelOrNoneChoiceFilter(django_filters.ModelChoiceFilter):
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = '''
+        Make repeated requests to an endpoint in this process, first closing
+        the database connection after every request and then keeping it for
+        `CONN_MAX_AGE` seconds as configured, and report the connections
+        opened and the time taken by each
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/api/{}/fee-schemes/'.format(settings.API_VERSION),
+            help='Path, with any query string, to request'
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send, which must be in `ALLOWED_HOSTS`'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Number of requests to make with each setting'
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database whose connections are counted'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+        self.stdout.write('Requesting {path} using {vendor}'.format(
+            path=options['path'], vendor=connection.vendor
+        ))
+        try:
+            for max_age in (0, conn_max_age):
+                self.benchmark(
+                    connection, max_age, options['host'], options['path'],
+                    options['requests']
+                )
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+    def benchmark(self, connection, conn_max_age, host, path, requests):
+        # the new age applies from the next connection opened
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == opened_alias:
+                opened.append(connection)
+
+        opened_alias = connection.alias
+        connection_created.connect(count_connection)
+        client = Client(HTTP_HOST=host)
+        try:
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = client.get(path)
+                # as the request_finished signal does when serving requests,
+                # which the test client doesn't do
+                close_old_connections()
+                if response.status_code != 200:
+                    raise CommandError('{} responded with {}'.format(
+                        path, response.status_code
+                    ))
+            duration = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+
+        self.stdout.write(
+            'CONN_MAX_AGE={max_age}: {requests} requests opened {opened} '
+            'connections, {mean:.2f}ms per request'.format(
+                max_age=conn_max_age, requests=requests, opened=len(opened),
+                mean=duration*1000/requests
+            )
+        )
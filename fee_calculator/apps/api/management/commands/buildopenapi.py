@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from api.openapi import build_openapi_document
+from calculator.snapshot import get_data_version
+
+
+class Command(BaseCommand):
+    help = '''
+        Render the OpenAPI document of the API for the loaded scheme data, to
+        be served by the docs endpoint without generating it on request
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Path to write the document to (default: OPENAPI_DOCUMENT_PATH)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.OPENAPI_DOCUMENT_PATH
+        data_version = get_data_version()
+        content = build_openapi_document(data_version)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as document_file:
+            document_file.write(content)
+
+        if options['verbosity'] >= 1:
+            self.stdout.write(
+                'Wrote the OpenAPI document for data version "{version}" '
+                'to {path}'.format(version=data_version.version, path=path)
+            )
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from decimal import Decimal
+from itertools import islice
+import json
+import os
+import sys
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.exceptions import ValidationError
+
+from api.views import (
+    CalculatorLookups, check_calculation_params, get_calculation_from_params,
+    get_reference_param
+)
+from calculator.models import Scheme
+from calculator.snapshot import (
+    get_data_version, get_price_table, get_fee_type_index, get_units,
+    get_modifier_types, get_reference_data
+)
+from calculator.vectorized import calculate_totals, get_compiled_prices, np
+
+
+def read_csv(infile):
+    yield from csv.DictReader(infile)
+
+
+def read_ndjson(infile):
+    for line_number, line in enumerate(infile, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise CommandError(
+                    'Line {} is not valid JSON'.format(line_number)
+                )
+
+
+def chunked(rows, chunk_size):
+    rows = iter(rows)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
+
+
+def map_bounded(executor, fn, iterable, max_pending):
+    '''
+    Yield each item of `iterable` along with `fn(item)`, evaluated by
+    `executor`. Unlike `executor.map`, only `max_pending` items are read
+    ahead, so that memory use doesn't grow with the length of `iterable`.
+    '''
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= max_pending:
+            pending_item, future = pending.popleft()
+            yield pending_item, future.result()
+        pending.append((item, executor.submit(fn, item)))
+    while pending:
+        pending_item, future = pending.popleft()
+        yield pending_item, future.result()
+
+
+def warm_snapshots():
+    # checking the version first, as the first check clears the snapshots
+    get_data_version()
+    get_price_table()
+    get_fee_type_index()
+    get_units()
+    get_modifier_types()
+    get_reference_data()
+    if np is not None:
+        get_compiled_prices()
+
+
+def calculate_rows(rows):
+    '''
+    Calculate the amount for each row of calculator parameters, plus
+    `scheme`, giving either `{'amount': ...}` or `{'errors': [...]}`
+    '''
+    warm_snapshots()
+    lookups = CalculatorLookups()
+    calculations = []
+    results = []
+    for row in rows:
+        try:
+            if not isinstance(row, dict):
+                raise ValidationError('Calculation must be an object')
+            # empty CSV cells and JSON nulls are treated as missing values
+            params = {
+                name: value for name, value in row.items()
+                if value is not None and value != ''
+            }
+            check_calculation_params(params)
+            scheme = get_reference_param(
+                params, 'scheme', Scheme, required=True
+            )
+            calculations.append(
+                get_calculation_from_params(scheme, params, lookups)
+            )
+            results.append(None)
+        except ValidationError as e:
+            results.append({'errors': [str(error) for error in e.detail]})
+
+    amounts = iter(calculate_totals(calculations))
+    return [
+        result or {'amount': str(next(amounts).quantize(Decimal('0.01')))}
+        for result in results
+    ]
+
+
+class CSVWriter:
+
+    def __init__(self, outfile):
+        self.outfile = outfile
+        self.writer = None
+
+    def write(self, row, result):
+        if self.writer is None:
+            self.writer = csv.DictWriter(
+                self.outfile, list(row.keys()) + ['amount', 'errors'],
+                extrasaction='ignore'
+            )
+            self.writer.writeheader()
+        self.writer.writerow(dict(
+            row, amount=result.get('amount', ''),
+            errors='; '.join(result.get('errors', []))
+        ))
+
+
+class NDJSONWriter:
+
+    def __init__(self, outfile):
+        self.outfile = outfile
+
+    def write(self, row, result):
+        if isinstance(row, dict):
+            result = dict(row, **result)
+        self.outfile.write(json.dumps(result) + '\n')
+
+
+FORMATS = {
+    'csv': (read_csv, CSVWriter),
+    'ndjson': (read_ndjson, NDJSONWriter),
+}
+
+
+class Command(BaseCommand):
+    help = '''
+        Calculate the amounts for a CSV or NDJSON file of calculations. Each
+        row takes the same values as the query parameters of the calculate
+        endpoint, plus `scheme`, and is written out with its `amount` or
+        `errors` added.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', help='Path of the file of calculations, or - for stdin'
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='Path to write the results to, or - for stdout (default)'
+        )
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS),
+            help=(
+                'Format of the input and output; by default csv for a .csv '
+                'input file and ndjson otherwise'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help=(
+                'Number of worker processes (default: number of CPUs); 1 '
+                'calculates in this process'
+            )
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of calculations sent to a worker at once'
+        )
+
+    def open(self, path, mode, default):
+        if path == '-':
+            return default
+        try:
+            return open(path, mode, newline='')
+        except OSError as e:
+            raise CommandError(e)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        file_format = options['format'] or (
+            'csv' if options['input'].lower().endswith('.csv') else 'ndjson'
+        )
+        read_rows, writer_class = FORMATS[file_format]
+        infile = self.open(options['input'], 'r', sys.stdin)
+        outfile = self.open(options['output'], 'w', self.stdout)
+
+        start = time.monotonic()
+        row_count = 0
+        error_count = 0
+        try:
+            writer = writer_class(outfile)
+            for chunk, results in self.calculate(
+                chunked(read_rows(infile), options['chunk_size']),
+                options['workers']
+            ):
+                for row, result in zip(chunk, results):
+                    writer.write(row, result)
+                row_count += len(chunk)
+                error_count += sum(1 for result in results if 'errors' in result)
+                if self.verbosity >= 2:
+                    self.stderr.write('{} calculations made'.format(row_count))
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+            if outfile is not self.stdout:
+                outfile.close()
+
+        duration = time.monotonic() - start
+        if self.verbosity >= 1:
+            self.stderr.write(
+                '{rows} calculations made ({errors} with errors) in '
+                '{duration:.2f}s: {rate:.0f} per second'.format(
+                    rows=row_count, errors=error_count, duration=duration,
+                    rate=row_count / duration if duration else 0
+                )
+            )
+
+    def calculate(self, chunks, workers):
+        '''
+        Yield each chunk of rows along with its results, calculating chunks
+        in parallel in `workers` processes
+        '''
+        if workers <= 1:
+            for chunk in chunks:
+                yield chunk, calculate_rows(chunk)
+            return
+
+        # each worker opens its own database connection
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from map_bounded(
+                executor, calculate_rows, chunks, workers * 2
+            )
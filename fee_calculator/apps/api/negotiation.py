@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class FallbackContentNegotiation(DefaultContentNegotiation):
+    """
+    Use the first renderer when the `Accept` header matches none of them,
+    e.g. for clients which always send `Accept: application/json`. An
+    unknown `?format=` is still a 404.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return (renderers[0], renderers[0].media_type)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.utils.http import quote_etag
+from rest_framework.schemas import SchemaGenerator
+from rest_framework_swagger.renderers import OpenAPICodec, OpenAPIRenderer
+
+from calculator.snapshot import get_data_version, register_snapshot
+
+
+TITLE = 'Calculator API'
+
+
+def build_openapi_document(data_version):
+    """
+    Render the OpenAPI document of the whole API, stamped with the version
+    of the scheme data that its calculator parameters were taken from. It
+    has no host, so it is valid wherever it is served from.
+    """
+    schema = SchemaGenerator(title=TITLE).get_schema(public=True)
+    document = json.loads(OpenAPICodec().encode(
+        schema, **OpenAPIRenderer().get_customizations()
+    ).decode('utf-8'))
+    document['info']['version'] = settings.API_VERSION
+    document['info']['x-data-version'] = data_version.version
+    return json.dumps(document, sort_keys=True).encode('utf-8')
+
+
+class OpenAPIDocument:
+
+    def __init__(self, content):
+        self.content = content
+        self.data_version = json.loads(
+            content.decode('utf-8')
+        )['info'].get('x-data-version')
+        self.etag = quote_etag(hashlib.sha1(content).hexdigest())
+
+
+def load_openapi_document(path):
+    try:
+        with open(path, 'rb') as document_file:
+            return OpenAPIDocument(document_file.read())
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class OpenAPIDocumentCache:
+    """
+    Keeps the OpenAPI document for the current data version in memory,
+    loaded from `OPENAPI_DOCUMENT_PATH` if that was built from the same data
+    or else generated on first use
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.document = None
+
+    def clear(self):
+        # generating the document checks the data version, which may clear
+        # snapshots while the lock is held
+        self.document = None
+
+    def get(self):
+        data_version = get_data_version()
+        document = self.document
+        if document is None or document.data_version != data_version.version:
+            with self.lock:
+                document = self.document
+                if (
+                    document is None or
+                    document.data_version != data_version.version
+                ):
+                    document = load_openapi_document(
+                        settings.OPENAPI_DOCUMENT_PATH
+                    )
+                    if (
+                        document is None or
+                        document.data_version != data_version.version
+                    ):
+                        document = OpenAPIDocument(
+                            build_openapi_document(data_version)
+                        )
+                    self.document = document
+        return document
+
+
+openapi_document_cache = register_snapshot(OpenAPIDocumentCache())
+
+
+def get_openapi_document():
+    return openapi_document_cache.get()
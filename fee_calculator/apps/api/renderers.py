@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import abc
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class RowRenderer(BaseRenderer, metaclass=abc.ABCMeta):
+    """
+    Renders a sequence of rows, either all at once or lazily with
+    `render_rows` for streaming responses. Errors are rendered as a single
+    row.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if (
+            response is not None and response.exception or
+            not isinstance(data, list)
+        ):
+            data = [self.get_error_row(data)]
+        return ''.join(self.render_rows(data))
+
+    def get_error_row(self, data):
+        return data
+
+    @abc.abstractmethod
+    def render_rows(self, rows):
+        pass
+
+
+class NDJSONRenderer(RowRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_rows(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=encoders.JSONEncoder) + '\n'
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(RowRenderer):
+    """
+    Renders rows with a header taken from the keys of the first row. Nested
+    values are written as JSON.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, cls=encoders.JSONEncoder)
+        return value
+
+    def get_error_row(self, data):
+        if isinstance(data, dict):
+            return data
+        return {'errors': data}
+
+    def render_rows(self, rows):
+        writer = csv.writer(Echo())
+        header = None
+        for row in rows:
+            if header is None:
+                header = list(row.keys())
+                yield writer.writerow(header)
+            yield writer.writerow(
+                [self.render_value(row[key]) for key in header]
+            )
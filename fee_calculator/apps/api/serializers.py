@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
+from django.db import models
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from calculator.models import (
     Scheme, Scenario, FeeType, AdvocateType, OffenceClass, Price, Unit,
-    ModifierType, Modifier, ScenarioCode
+    ModifierType, Modifier
 )
+from calculator.snapshot import get_scenario_codes
 
 
 class SchemeSerializer(serializers.ModelSerializer):
@@ -37,7 +39,9 @@ class ScenarioSerializer(serializers.ModelSerializer):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if 'scheme_pk' in self.context:
+        if 'scheme' in self.context:
+            self.scheme = self.context['scheme']
+        elif 'scheme_pk' in self.context:
             self.scheme = get_object_or_404(Scheme, pk=self.context['scheme_pk'])
 
     class Meta:
@@ -50,10 +54,7 @@ class ScenarioSerializer(serializers.ModelSerializer):
 
     def get_code(self, obj):
         if hasattr(self, 'scheme'):
-            try:
-                return obj.codes.get(scheme_type=self.scheme.base_type).code
-            except ScenarioCode.DoesNotExist:
-                pass
+            return get_scenario_codes().get((obj.pk, self.scheme.base_type))
         return None
 
 
@@ -113,8 +114,30 @@ class ModifierSerializer(serializers.ModelSerializer):
         )
 
 
+class ModifierListSerializer(serializers.ListSerializer):
+    """
+    Modifiers are shared between many prices, so the representation of each
+    is built once and reused for every price it belongs to.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.representations = {}
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        representations = []
+        for modifier in iterable:
+            if modifier.pk not in self.representations:
+                self.representations[modifier.pk] = (
+                    self.child.to_representation(modifier)
+                )
+            representations.append(self.representations[modifier.pk])
+        return representations
+
+
 class PriceSerializer(serializers.ModelSerializer):
-    modifiers = ModifierSerializer(many=True, read_only=True)
+    modifiers = ModifierListSerializer(child=ModifierSerializer(), read_only=True)
 
     class Meta:
         model = Price
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+from django.db.models import F
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from calculator.models import DataVersion, Price
+from calculator.snapshot import data_version_tracker
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
+
+
+class BatchCalculatorApiTestCase(SnapshotTestMixin, APITestCase):
+    endpoint = '/api/{api}/fee-schemes/{{scheme}}/calculate/batch/'.format(
+        api=settings.API_VERSION
+    )
+    all_schemes_endpoint = '/api/{api}/calculate/batch/'.format(
+        api=settings.API_VERSION
+    )
+    single_endpoint = '/api/{api}/fee-schemes/{{scheme}}/calculate/'.format(
+        api=settings.API_VERSION
+    )
+    calculations = [
+        {
+            'fee_type_code': 'AGFS_FEE', 'scenario': 2, 'offence_class': 'A',
+            'advocate_type': 'JRALONE', 'day': 1,
+        },
+        {
+            'fee_type_code': 'AGFS_FEE', 'scenario': 2, 'offence_class': 'A',
+            'advocate_type': 'JRALONE', 'day': 3, 'NUMBER_OF_DEFENDANTS': 2,
+        },
+        {
+            'fee_type_code': 'AGFS_FEE', 'scenario': 3, 'offence_class': 'A',
+            'advocate_type': 'QC', 'DAY': '2.5',
+        },
+    ]
+
+    def get_single_amount(self, scheme, calculation):
+        response = self.client.get(
+            self.single_endpoint.format(scheme=scheme), data=calculation
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['amount']
+
+    def test_results_match_single_calculations(self):
+        response = self.client.post(
+            self.endpoint.format(scheme=1), self.calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [
+                {'amount': self.get_single_amount(1, calculation)}
+                for calculation in self.calculations
+            ]
+        )
+
+    def test_all_schemes_results_match_single_calculations(self):
+        calculations = [
+            dict(calculation, scheme=scheme)
+            for scheme in (1, 3)
+            for calculation in self.calculations
+        ]
+        response = self.client.post(
+            self.all_schemes_endpoint, calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [
+                {'amount': self.get_single_amount(
+                    calculation['scheme'], calculation
+                )}
+                for calculation in calculations
+            ]
+        )
+
+    def test_errors_reported_per_calculation(self):
+        calculations = [
+            self.calculations[0],
+            dict(self.calculations[0], scenario='burps'),
+            dict(self.calculations[0], day='many'),
+            'burps',
+        ]
+        response = self.client.post(
+            self.endpoint.format(scheme=1), calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertIn('amount', results[0])
+        self.assertEqual(
+            results[1], {'errors': ['\'burps\' is not a valid `scenario`']}
+        )
+        self.assertEqual(results[2], {'errors': ['`day` must be a number']})
+        self.assertEqual(results[3], {'errors': ['Calculation must be an object']})
+
+    def test_errors_reported_for_values_of_wrong_type(self):
+        calculations = [
+            dict(self.calculations[0], day=None),
+            self.calculations[0],
+            dict(self.calculations[0], day=''),
+            dict(self.calculations[0], scenario={}),
+            dict(self.calculations[0], scenario=[2]),
+            dict(self.calculations[0], advocate_type=None),
+            self.calculations[1],
+        ]
+        response = self.client.post(
+            self.endpoint.format(scheme=1), calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [
+            {'errors': ['`day` must be a string or a number']},
+            {'amount': self.get_single_amount(1, self.calculations[0])},
+            {'errors': ['`day` must be a number']},
+            {'errors': ['`scenario` must be a string or a number']},
+            {'errors': ['`scenario` must be a string or a number']},
+            {'errors': ['`advocate_type` must be a string or a number']},
+            {'amount': self.get_single_amount(1, self.calculations[1])},
+        ])
+
+    def test_errors_reported_for_counts_that_are_not_finite(self):
+        calculations = [
+            dict(self.calculations[0], day='Infinity'),
+            dict(self.calculations[0], day='-Infinity'),
+            dict(self.calculations[0], day='NaN'),
+            dict(self.calculations[0], day='sNaN'),
+            self.calculations[0],
+        ]
+        response = self.client.post(
+            self.endpoint.format(scheme=1), calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [
+            {'errors': ['`day` must be a number']},
+            {'errors': ['`day` must be a number']},
+            {'errors': ['`day` must be a number']},
+            {'errors': ['`day` must be a number']},
+            {'amount': self.get_single_amount(1, self.calculations[0])},
+        ])
+
+    def test_all_schemes_scheme_of_wrong_type(self):
+        calculations = [
+            dict(self.calculations[0], scheme={}),
+            dict(self.calculations[0], scheme=1),
+        ]
+        response = self.client.post(
+            self.all_schemes_endpoint, calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [
+            {'errors': ['`scheme` must be a string or a number']},
+            {'amount': self.get_single_amount(1, self.calculations[0])},
+        ])
+
+    @override_settings(CALCULATION_CACHE_SIZE=0)
+    def test_data_changed_by_another_process_picked_up(self):
+        amount = self.get_single_amount(1, self.calculations[2])
+        # as another process would, without clearing this one's snapshots
+        Price.objects.filter(scheme=1).update(
+            fixed_fee=F('fixed_fee') + 1000, fee_per_unit=F('fee_per_unit') + 1000
+        )
+        DataVersion.objects.update_or_create(pk=1, defaults={
+            'version': 'other', 'modified': timezone.now()
+        })
+        # as if the check interval had passed
+        data_version_tracker.reset()
+
+        response = self.client.post(
+            self.endpoint.format(scheme=1), self.calculations[2:], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.json(), [{'amount': amount}])
+        self.assertEqual(
+            response.json(),
+            [{'amount': self.get_single_amount(1, self.calculations[2])}]
+        )
+
+    def test_all_schemes_scheme_required(self):
+        response = self.client.post(
+            self.all_schemes_endpoint, self.calculations[:1], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(), [{'errors': ['`scheme` is a required field']}]
+        )
+
+    @prevent_request_warnings
+    def test_400_when_not_a_list(self):
+        response = self.client.post(
+            self.endpoint.format(scheme=1), self.calculations[0], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @prevent_request_warnings
+    def test_400_when_over_limit(self):
+        with self.settings(CALCULATOR_BATCH_LIMIT=2):
+            response = self.client.post(
+                self.endpoint.format(scheme=1), self.calculations, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @prevent_request_warnings
+    def test_404_for_nonexistent_scheme(self):
+        response = self.client.post(
+            self.endpoint.format(scheme=999999), self.calculations, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @prevent_request_warnings
+    def test_get_not_allowed(self):
+        response = self.client.get(self.endpoint.format(scheme=1))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
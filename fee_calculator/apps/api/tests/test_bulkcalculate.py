@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.management.commands.bulkcalculate import map_bounded
+
+
+class BulkCalculateTestCase(TestCase):
+    calculate_endpoint = '/api/{api}/fee-schemes/{{scheme}}/calculate/'.format(
+        api=settings.API_VERSION
+    )
+    calculations = [
+        {
+            'scheme': '1', 'fee_type_code': 'AGFS_FEE', 'scenario': '2',
+            'offence_class': 'A', 'advocate_type': 'JRALONE', 'day': '1',
+            'NUMBER_OF_DEFENDANTS': '',
+        },
+        {
+            'scheme': '1', 'fee_type_code': 'AGFS_FEE', 'scenario': '2',
+            'offence_class': 'A', 'advocate_type': 'JRALONE', 'day': '3',
+            'NUMBER_OF_DEFENDANTS': '2',
+        },
+        {
+            'scheme': '3', 'fee_type_code': 'AGFS_FEE', 'scenario': '3',
+            'offence_class': 'A', 'advocate_type': 'QC', 'day': '2.5',
+            'NUMBER_OF_DEFENDANTS': '',
+        },
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def get_amount(self, calculation):
+        params = {
+            name: value for name, value in calculation.items()
+            if name != 'scheme' and value
+        }
+        response = self.client.get(
+            self.calculate_endpoint.format(scheme=calculation['scheme']),
+            params
+        )
+        return response.json()['amount']
+
+    def bulk_calculate(self, filename, content, **options):
+        path = os.path.join(self.directory.name, filename)
+        with open(path, 'w') as infile:
+            infile.write(content)
+        output = io.StringIO()
+        call_command(
+            'bulkcalculate', path, workers=1, stdout=output,
+            stderr=io.StringIO(), **options
+        )
+        return output.getvalue()
+
+    def test_csv_amounts_match_calculator(self):
+        content = io.StringIO()
+        writer = csv.DictWriter(content, list(self.calculations[0].keys()))
+        writer.writeheader()
+        writer.writerows(self.calculations)
+
+        output = self.bulk_calculate('calculations.csv', content.getvalue())
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), len(self.calculations))
+        for row, calculation in zip(rows, self.calculations):
+            self.assertEqual(row['scheme'], calculation['scheme'])
+            self.assertEqual(
+                float(row['amount']), self.get_amount(calculation)
+            )
+            self.assertEqual(row['errors'], '')
+
+    def test_ndjson_errors_reported_per_row(self):
+        calculations = [
+            self.calculations[1],
+            dict(self.calculations[1], scenario='burps'),
+            dict(self.calculations[1], scheme=None),
+            'burps',
+            dict(self.calculations[1], scenario={'id': 2}),
+            dict(self.calculations[1], day=[3]),
+            dict(self.calculations[1], day='Infinity'),
+            self.calculations[1],
+        ]
+        output = self.bulk_calculate(
+            'calculations.ndjson',
+            ''.join(json.dumps(calculation) + '\n' for calculation in calculations),
+            chunk_size=2
+        )
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(
+            float(results[0]['amount']),
+            self.get_amount(self.calculations[1])
+        )
+        self.assertEqual(
+            results[1]['errors'], ['\'burps\' is not a valid `scenario`']
+        )
+        self.assertEqual(
+            results[2]['errors'], ['`scheme` is a required field']
+        )
+        self.assertEqual(
+            results[3], {'errors': ['Calculation must be an object']}
+        )
+        self.assertEqual(
+            results[4]['errors'], ['`scenario` must be a string or a number']
+        )
+        self.assertEqual(
+            results[5]['errors'], ['`day` must be a string or a number']
+        )
+        self.assertEqual(results[6]['errors'], ['`day` must be a number'])
+        self.assertEqual(
+            float(results[7]['amount']),
+            self.get_amount(self.calculations[1])
+        )
+
+    def test_map_bounded_preserves_order(self):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            self.assertEqual(
+                list(map_bounded(executor, lambda x: x * 2, range(10), 2)),
+                [(x, x * 2) for x in range(10)]
+            )
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
+
+
+class CalculatorByDateApiTestCase(SnapshotTestMixin, APITestCase):
+    endpoint = '/api/{api}/calculate/'.format(api=settings.API_VERSION)
+    scheme_endpoint = '/api/{api}/fee-schemes/{{scheme}}/calculate/'.format(
+        api=settings.API_VERSION
+    )
+    calculation = {
+        'fee_type_code': 'AGFS_FEE', 'scenario': 2, 'offence_class': 'A',
+        'advocate_type': 'JRALONE', 'day': 3, 'NUMBER_OF_DEFENDANTS': 2,
+    }
+
+    def test_amount_matches_scheme_in_force(self):
+        for case_date, scheme in (
+            ('2012-04-01', 1), ('2018-03-31', 1), ('2018-04-01', 3),
+            ('2019-01-01', 4), ('2021-01-01', 5),
+        ):
+            response = self.client.get(self.endpoint, dict(
+                self.calculation, scheme_type='agfs', case_date=case_date
+            ))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['scheme'], scheme)
+            self.assertEqual(
+                response.data['amount'],
+                self.client.get(
+                    self.scheme_endpoint.format(scheme=scheme), self.calculation
+                ).data['amount']
+            )
+
+    def test_warm_calculation_makes_no_queries(self):
+        params = dict(self.calculation, scheme_type='AGFS', case_date='2019-01-01')
+        for endpoint, params in (
+            (self.endpoint, params),
+            (self.scheme_endpoint.format(scheme=4), self.calculation),
+        ):
+            self.assertEqual(
+                self.client.get(endpoint, params).status_code, status.HTTP_200_OK
+            )
+            with self.assertNumQueries(0):
+                response = self.client.get(endpoint, dict(params, day=4))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @prevent_request_warnings
+    def test_400_for_date_without_scheme(self):
+        response = self.client.get(self.endpoint, dict(
+            self.calculation, scheme_type='AGFS', case_date='2000-01-01'
+        ))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data[0],
+            'scheme_type and case_date must match a unique scheme; 0 were found'
+        )
+
+    @prevent_request_warnings
+    def test_400_for_invalid_scheme_type(self):
+        response = self.client.get(self.endpoint, dict(
+            self.calculation, scheme_type='burps', case_date='2019-01-01'
+        ))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data[0], '`scheme_type` should be one of: [AGFS, LGFS]'
+        )
+
+    @prevent_request_warnings
+    def test_400_for_invalid_case_date(self):
+        response = self.client.get(self.endpoint, dict(
+            self.calculation, scheme_type='AGFS', case_date='4thJanuary2019'
+        ))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data[0], '`case_date` should be in the format YYYY-MM-DD'
+        )
+
+    @prevent_request_warnings
+    def test_400_for_missing_case_date(self):
+        response = self.client.get(
+            self.endpoint, dict(self.calculation, scheme_type='AGFS')
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], '`case_date` is a required field')
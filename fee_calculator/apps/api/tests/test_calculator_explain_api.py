@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+
+from django.conf import settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from calculator.models import Price
+from calculator.tests.lib.utils import prevent_request_warnings
+
+
+class CalculatorExplainApiTestCase(APITestCase):
+    endpoint = '/api/{api}/fee-schemes/{{scheme}}/calculate/'.format(
+        api=settings.API_VERSION
+    )
+    by_date_endpoint = '/api/{api}/calculate/'.format(api=settings.API_VERSION)
+
+    def get_calculation(self):
+        price = Price.objects.filter(
+            modifiers__isnull=False, advocate_type__isnull=False,
+            offence_class__isnull=False
+        ).select_related('fee_type').first()
+        modifier = price.modifiers.all()[0]
+        return price, {
+            'fee_type_code': price.fee_type.code,
+            'scenario': price.scenario_id,
+            'advocate_type': price.advocate_type_id,
+            'offence_class': price.offence_class_id,
+            price.unit_id.lower(): max(price.limit_from, 1) + 1,
+            modifier.modifier_type.name: max(modifier.limit_from, 1) + 1,
+        }
+
+    def test_explanation_matches_calculation(self):
+        price, calculation = self.get_calculation()
+        endpoint = self.endpoint.format(scheme=price.scheme_id)
+        response = self.client.get(endpoint, dict(calculation, explain=1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['amount'],
+            self.client.get(endpoint, calculation).data['amount']
+        )
+
+        explanation = response.data['explanation']
+        self.assertEqual(explanation['aggregation'], 'SUM')
+        self.assertIn(price.pk, [
+            matched_price['price'] for matched_price in explanation['prices']
+        ])
+        self.assertEqual(
+            sum(
+                matched_price['amount']
+                for matched_price in explanation['prices']
+            ).quantize(Decimal('0.01')),
+            response.data['amount']
+        )
+        for matched_price in explanation['prices']:
+            for step in matched_price['modifiers']:
+                self.assertTrue(Price.objects.filter(
+                    pk=matched_price['price'], modifiers=step['modifier']
+                ).exists())
+        self.assertEqual(
+            list(explanation['timings']),
+            ['scheme', 'params', 'fee_type', 'price_lookup', 'arithmetic']
+        )
+
+    def test_no_explanation_by_default(self):
+        price, calculation = self.get_calculation()
+        for explain in ('', '0', 'false'):
+            response = self.client.get(
+                self.endpoint.format(scheme=price.scheme_id),
+                dict(calculation, explain=explain)
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('explanation', response.data)
+
+    def test_explanation_by_date(self):
+        _, calculation = self.get_calculation()
+        response = self.client.get(self.by_date_endpoint, dict(
+            calculation, scheme_type='AGFS', case_date='2019-01-01', explain=1
+        ))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['scheme'], 4)
+        self.assertIn('explanation', response.data)
+
+    @prevent_request_warnings
+    def test_400_for_invalid_explain(self):
+        price, calculation = self.get_calculation()
+        response = self.client.get(
+            self.endpoint.format(scheme=price.scheme_id),
+            dict(calculation, explain='burps')
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], '`explain` should be one of: [1, 0]')
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+from django.test import TestCase
+
+from api.views import CalculatorView
+from calculator.models import Unit
+from calculator.snapshot import update_data_version
+from calculator.tests.lib.utils import SnapshotTestMixin
+
+
+class CalculatorSchemaTestCase(SnapshotTestMixin, TestCase):
+    path = '/api/{api}/fee-schemes/{{scheme_pk}}/calculate/'.format(
+        api=settings.API_VERSION
+    )
+
+    def get_field_names(self):
+        link = CalculatorView.schema.get_link(self.path, 'GET', '')
+        return [field.name for field in link.fields]
+
+    def test_fields_include_units_and_modifier_types(self):
+        field_names = self.get_field_names()
+        self.assertEqual(field_names[:2], ['scheme_pk', 'fee_type_code'])
+        self.assertIn('day', field_names)
+        self.assertIn('number_of_defendants', field_names)
+
+    def test_fields_built_once(self):
+        self.get_field_names()
+        with self.assertNumQueries(0):
+            self.get_field_names()
+
+    def test_fields_updated_with_data(self):
+        self.assertNotIn('burps', self.get_field_names())
+
+        Unit.objects.create(pk='BURPS', name='Burps')
+        update_data_version()
+        self.assertIn('burps', self.get_field_names())
+
+    def test_docs_available(self):
+        response = self.client.get(
+            '/api/{api}/docs/?format=openapi'.format(api=settings.API_VERSION)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'number_of_defendants', response.content)
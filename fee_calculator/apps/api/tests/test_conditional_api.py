@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from calculator.snapshot import update_data_version
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
+
+
+class ConditionalApiTestCase(SnapshotTestMixin, APITestCase):
+    schemes_endpoint = '/api/{api}/fee-schemes/'.format(
+        api=settings.API_VERSION
+    )
+    calculate_endpoint = '/api/{api}/fee-schemes/1/calculate/'.format(
+        api=settings.API_VERSION
+    )
+
+    def test_response_has_caching_headers(self):
+        response = self.client.get(self.schemes_endpoint)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn(
+            'max-age={}'.format(settings.DATA_CACHE_MAX_AGE),
+            response['Cache-Control']
+        )
+
+    def test_304_for_matching_etag_without_querying(self):
+        response = self.client.get(self.schemes_endpoint)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.schemes_endpoint, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_304_for_unmodified_since(self):
+        response = self.client.get(self.schemes_endpoint)
+
+        response = self.client.get(
+            self.schemes_endpoint,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_differs_by_query(self):
+        response_1 = self.client.get(self.schemes_endpoint, {'type': 'AGFS'})
+        response_2 = self.client.get(self.schemes_endpoint, {'type': 'LGFS'})
+        self.assertNotEqual(response_1['ETag'], response_2['ETag'])
+
+    def test_etag_changes_with_data_version(self):
+        etag = self.client.get(self.schemes_endpoint)['ETag']
+
+        update_data_version()
+
+        response = self.client.get(
+            self.schemes_endpoint, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_calculate_etag_ignores_parameter_order(self):
+        response_1 = self.client.get(
+            self.calculate_endpoint +
+            '?fee_type_code=AGFS_FEE&scenario=2&offence_class=A&day=2'
+        )
+        self.assertEqual(response_1.status_code, status.HTTP_200_OK)
+
+        response_2 = self.client.get(
+            self.calculate_endpoint +
+            '?day=2&offence_class=A&scenario=2&fee_type_code=AGFS_FEE',
+            HTTP_IF_NONE_MATCH=response_1['ETag']
+        )
+        self.assertEqual(response_2.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @prevent_request_warnings
+    def test_no_etag_for_errors(self):
+        response = self.client.get(
+            self.calculate_endpoint + '?fee_type_code=AGFS_FEE&scenario=burps'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.has_header('ETag'))
@@ -5,9 +5,12 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from calculator.models import Scheme
-from calculator.tests.lib.utils import prevent_request_warnings
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
 
-class FeeTypeApiTestCase(APITestCase):
+
+class FeeTypeApiTestCase(SnapshotTestMixin, APITestCase):
     endpoint = '/api/{api}/fee-schemes/{{scheme}}/fee-types/'.format(
         api=settings.API_VERSION
     )
@@ -26,6 +29,18 @@ class FeeTypeApiTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreater(len(response.data['results']), 0)
 
+    def test_get_list_with_filters_constant_number_of_queries(self):
+        url = (
+            self.endpoint.format(scheme=1) +
+            '?offence_class=A&advocate_type=JRALONE&scenario=2&is_basic=true'
+        )
+        self.client.get(url)
+
+        # scheme, count and page of fee types
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     @prevent_request_warnings
     def test_get_list_400_with_invalid_scenario(self):
         response = self.client.get(
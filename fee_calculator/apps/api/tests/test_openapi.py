@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from calculator.snapshot import (
+    clear_snapshots, get_data_version, update_data_version
+)
+from calculator.tests.lib.utils import SnapshotTestMixin
+
+
+class OpenAPIDocumentTestCase(SnapshotTestMixin, TestCase):
+    endpoint = '/api/{api}/docs/'.format(api=settings.API_VERSION)
+
+    def setUp(self):
+        super().setUp()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'openapi.json')
+        path_settings = override_settings(OPENAPI_DOCUMENT_PATH=self.path)
+        path_settings.enable()
+        self.addCleanup(path_settings.disable)
+
+    def get_document(self):
+        response = self.client.get(self.endpoint, {'format': 'openapi'})
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def test_document_generated_without_prebuilt_file(self):
+        document = self.get_document()
+        self.assertIn(
+            '/api/{api}/fee-schemes/{{scheme_pk}}/calculate/'.format(
+                api=settings.API_VERSION
+            ),
+            document['paths']
+        )
+        self.assertEqual(
+            document['info']['x-data-version'], get_data_version().version
+        )
+
+    def test_prebuilt_document_served(self):
+        call_command('buildopenapi', stdout=io.StringIO())
+        clear_snapshots()
+
+        with mock.patch('api.openapi.build_openapi_document') as build:
+            with open(self.path, 'rb') as document_file:
+                self.assertEqual(
+                    self.client.get(self.endpoint, {'format': 'openapi'}).content,
+                    document_file.read()
+                )
+        build.assert_not_called()
+
+    def test_prebuilt_document_for_other_data_ignored(self):
+        call_command('buildopenapi', stdout=io.StringIO())
+        update_data_version()
+
+        self.assertEqual(
+            self.get_document()['info']['x-data-version'],
+            get_data_version().version
+        )
+
+    def test_document_cacheable(self):
+        response = self.client.get(self.endpoint, {'format': 'openapi'})
+        self.assertEqual(
+            response['Cache-Control'],
+            'public, max-age={}'.format(settings.OPENAPI_CACHE_MAX_AGE)
+        )
+
+        response = self.client.get(
+            self.endpoint, {'format': 'openapi'},
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_swagger_ui_for_browsers(self):
+        response = self.client.get(self.endpoint, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'window.drsSpec', response.content)
@@ -4,9 +4,14 @@ from django.conf import settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from calculator.tests.lib.utils import prevent_request_warnings
+from api.serializers import ModifierSerializer
+from calculator.models import Price
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
 
-class PriceApiTestCase(APITestCase):
+
+class PriceApiTestCase(SnapshotTestMixin, APITestCase):
     endpoint = '/api/{api}/fee-schemes/{{scheme}}/prices/'.format(
         api=settings.API_VERSION
     )
@@ -34,3 +39,21 @@ class PriceApiTestCase(APITestCase):
             '?offence_class=Z&advocate_type=JRALONE&scenario=2&fee_type_code=AGFS_FEE&day=1'
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_list_modifiers(self):
+        response = self.client.get(self.endpoint.format(scheme=2))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for result in response.data['results']:
+            price = Price.objects.get(pk=result['id'])
+            self.assertEqual(
+                result['modifiers'],
+                ModifierSerializer(price.modifiers.all(), many=True).data
+            )
+
+    def test_get_list_constant_number_of_queries(self):
+        self.client.get(self.endpoint.format(scheme=2))
+
+        # scheme, count, page of prices, modifiers and modifier types
+        with self.assertNumQueries(5):
+            response = self.client.get(self.endpoint.format(scheme=2))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
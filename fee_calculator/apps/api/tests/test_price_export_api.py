@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+from unittest import mock
+
+from django.conf import settings
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.views import PriceViewSet
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
+
+
+class PriceExportApiTestCase(SnapshotTestMixin, APITestCase):
+    endpoint = '/api/{api}/fee-schemes/{{scheme}}/prices/export/'.format(
+        api=settings.API_VERSION
+    )
+    list_endpoint = '/api/{api}/fee-schemes/{{scheme}}/prices/'.format(
+        api=settings.API_VERSION
+    )
+
+    def get_all_prices(self, scheme, params=None):
+        prices = []
+        url = self.list_endpoint.format(scheme=scheme)
+        while url:
+            response = self.client.get(url, data=params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.json()
+            prices.extend(data['results'])
+            url = data['next']
+            params = None
+        return prices
+
+    def get_content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_matches_list(self):
+        response = self.client.get(self.endpoint.format(scheme=1))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [
+            json.loads(line)
+            for line in self.get_content(response).splitlines()
+        ]
+        self.assertEqual(rows, self.get_all_prices(1))
+
+    def test_ndjson_in_small_chunks_matches_list(self):
+        with mock.patch.object(PriceViewSet, 'export_chunk_size', 7):
+            response = self.client.get(self.endpoint.format(scheme=1))
+            rows = [
+                json.loads(line)
+                for line in self.get_content(response).splitlines()
+            ]
+        self.assertEqual(rows, self.get_all_prices(1))
+
+    def test_ndjson_is_default_format(self):
+        response = self.client.get(self.endpoint.format(scheme=1), {'format': 'ndjson'})
+        default_response = self.client.get(self.endpoint.format(scheme=1))
+        self.assertEqual(
+            self.get_content(response), self.get_content(default_response)
+        )
+
+    def test_ndjson_for_json_clients(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=1), HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        default_response = self.client.get(self.endpoint.format(scheme=1))
+        self.assertEqual(
+            self.get_content(response), self.get_content(default_response)
+        )
+
+    def test_csv_for_csv_clients(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=2), HTTP_ACCEPT='text/csv'
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+
+    def test_csv_matches_list(self):
+        response = self.client.get(self.endpoint.format(scheme=2), {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.get_content(response))))
+        prices = self.get_all_prices(2)
+
+        self.assertEqual(len(rows), len(prices))
+        for row, price in zip(rows, prices):
+            self.assertEqual(int(row['id']), price['id'])
+            self.assertEqual(row['fee_per_unit'], price['fee_per_unit'])
+            self.assertEqual(row['offence_class'], price['offence_class'] or '')
+            self.assertEqual(json.loads(row['modifiers']), price['modifiers'])
+
+    def test_filters_applied(self):
+        params = {
+            'offence_class': 'A', 'advocate_type': 'JRALONE', 'scenario': 2,
+            'fee_type_code': 'AGFS_FEE',
+        }
+        response = self.client.get(self.endpoint.format(scheme=1), params)
+        rows = [
+            json.loads(line)
+            for line in self.get_content(response).splitlines()
+        ]
+        self.assertGreater(len(rows), 0)
+        self.assertEqual(rows, self.get_all_prices(1, params))
+
+    def test_chunks_prefetched(self):
+        response = self.client.get(self.endpoint.format(scheme=1))
+        content = self.get_content(response)
+        # scheme, prices, and modifiers with their types for each chunk
+        with self.assertNumQueries(4):
+            response = self.client.get(self.endpoint.format(scheme=1))
+            self.assertEqual(self.get_content(response), content)
+
+    @prevent_request_warnings
+    def test_400_with_invalid_filter(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=1), {'scenario': 'burps'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = json.loads(response.content.decode('utf-8'))
+        self.assertIn('scenario', errors)
+
+    @prevent_request_warnings
+    def test_400_with_invalid_filter_as_csv(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=1), {'scenario': 'burps', 'format': 'csv'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        rows = list(csv.DictReader(io.StringIO(response.content.decode('utf-8'))))
+        self.assertEqual(len(rows), 1)
+        self.assertIn('scenario', rows[0])
+
+    @prevent_request_warnings
+    def test_404_with_unknown_format(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=1), {'format': 'xml'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @prevent_request_warnings
+    def test_404_for_nonexistent_scheme(self):
+        response = self.client.get(self.endpoint.format(scheme=999999))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            json.loads(response.content.decode('utf-8')),
+            {'detail': 'Not found.'}
+        )
+
+    @prevent_request_warnings
+    def test_404_for_nonexistent_scheme_as_csv(self):
+        response = self.client.get(
+            self.endpoint.format(scheme=999999), {'format': 'csv'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            list(csv.DictReader(io.StringIO(response.content.decode('utf-8')))),
+            [{'detail': 'Not found.'}]
+        )
@@ -4,11 +4,13 @@ from django.conf import settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from calculator.models import Scheme
-from calculator.tests.lib.utils import prevent_request_warnings
+from calculator.models import Scheme, ScenarioCode
+from calculator.tests.lib.utils import (
+    SnapshotTestMixin, prevent_request_warnings
+)
 
 
-class ScenarioApiTestCase(APITestCase):
+class ScenarioApiTestCase(SnapshotTestMixin, APITestCase):
     endpoint = '/api/{api}/fee-schemes/{{scheme}}/scenarios/'.format(
         api=settings.API_VERSION
     )
@@ -19,6 +21,32 @@ class ScenarioApiTestCase(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             self.assertGreater(len(response.data['results']), 0)
 
+    def test_get_list_codes_for_scheme_type(self):
+        scheme = Scheme.objects.get(pk=2)
+        response = self.client.get(self.endpoint.format(scheme=scheme.pk))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for scenario in response.data['results']:
+            expected_code = ScenarioCode.objects.filter(
+                scenario_id=scenario['id'], scheme_type=scheme.base_type
+            ).values_list('code', flat=True).first()
+            self.assertEqual(scenario['code'], expected_code)
+
+    def test_get_list_constant_number_of_queries(self):
+        self.client.get(self.endpoint.format(scheme=1))
+
+        # scheme, count and page of scenarios
+        with self.assertNumQueries(3):
+            response = self.client.get(self.endpoint.format(scheme=1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_detail_constant_number_of_queries(self):
+        self.client.get(self.endpoint.format(scheme=1) + '3/')
+
+        # scheme and scenario
+        with self.assertNumQueries(2):
+            response = self.client.get(self.endpoint.format(scheme=1) + '3/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_get_detail_available(self):
         response = self.client.get(self.endpoint.format(scheme=1) + '3/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -2,12 +2,12 @@
 from django.conf.urls import url, include
 
 from rest_framework_nested import routers
-from rest_framework_swagger.views import get_swagger_view
 
 from api.views import (
     SchemeViewSet, FeeTypeViewSet, ScenarioViewSet,
     OffenceClassViewSet, AdvocateTypeViewSet, PriceViewSet, CalculatorView,
-    UnitViewSet, ModifierTypeViewSet
+    UnitViewSet, ModifierTypeViewSet, BatchCalculatorView, CalculatorByDateView,
+    OpenAPIDocumentView
 )
 
 
@@ -26,11 +26,13 @@ schemes_router.register(r'modifier-types', ModifierTypeViewSet,
                         base_name='modifier-types')
 schemes_router.register(r'prices', PriceViewSet, base_name='prices')
 
-schema_view = get_swagger_view(title='Calculator API')
-
 urlpatterns = (
     url(r'^fee-schemes/(?P<scheme_pk>[^/.]+)/calculate/$', CalculatorView.as_view(), name='calculator'),
+    url(r'^fee-schemes/(?P<scheme_pk>[^/.]+)/calculate/batch/$', BatchCalculatorView.as_view(),
+        name='calculator-batch'),
+    url(r'^calculate/$', CalculatorByDateView.as_view(), name='calculator-by-date'),
+    url(r'^calculate/batch/$', BatchCalculatorView.as_view(), name='calculator-batch-all-schemes'),
     url(r'^', include(router.urls)),
     url(r'^', include(schemes_router.urls)),
-    url(r'^docs/$', schema_view),
+    url(r'^docs/$', OpenAPIDocumentView.as_view(), name='docs'),
 )
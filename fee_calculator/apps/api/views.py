@@ -1,25 +1,48 @@
 # -*- coding: utf-8 -*-
+from calendar import timegm
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
+import hashlib
+import json
 import logging
 
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag, urlencode
+from django.views import View
 from django_filters.rest_framework import backends
-from rest_framework import viewsets, views
+from rest_framework import status, viewsets, views
+from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.compat import coreapi
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.schemas import AutoSchema
+from rest_framework_swagger.renderers import OpenAPIRenderer, SwaggerUIRenderer
+from rest_framework_swagger.settings import swagger_settings
 
 from calculator.constants import SCHEME_TYPE
 from calculator.models import (
     Scheme, FeeType, Scenario, OffenceClass, AdvocateType, Price, Unit,
-    ModifierType, calculate_total
+    ModifierType
+)
+from calculator.cache import calculation_cache
+from calculator.explain import StageTimer, explain_total, null_timer
+from calculator.snapshot import (
+    get_units, get_modifier_types, get_fee_type_index, get_data_version,
+    get_scheme_membership, get_reference_data, get_scheme_date_index
 )
 from .filters import (
     PriceFilter, FeeTypeFilter, CalculatorSchema
 )
+from .negotiation import FallbackContentNegotiation
+from .openapi import get_openapi_document
+from .renderers import NDJSONRenderer, CSVRenderer
 from .serializers import (
     SchemeSerializer, FeeTypeSerializer, ScenarioSerializer,
     OffenceClassSerializer, AdvocateTypeSerializer, PriceSerializer,
@@ -29,47 +52,251 @@ from .serializers import (
 logger = logging.getLogger('laa-calc')
 
 
-def get_param(request, param_name, required=False, default=None):
-    value = request.query_params.get(param_name, default)
+def get_param(params, param_name, required=False, default=None):
+    value = params.get(param_name, default)
     if value is None or value is '':
         if required:
             raise ValidationError('`%s` is a required field' % param_name)
     return value
 
 
-def get_model_param(
-    request, param_name, model_class, required=False, lookup='pk', many=False,
-    default=None
-):
-    result = get_param(request, param_name, required, default)
+def get_reference_instance(model_class, pk):
+    """
+    Get an instance of one of the models of `get_reference_data` by id, or
+    raise `KeyError`, `TypeError` or `ValueError` if there isn't one
+    """
+    return get_reference_data()[model_class][
+        model_class._meta.pk.get_prep_value(pk)
+    ]
+
+
+def get_reference_param(params, param_name, model_class, required=False):
+    value = get_param(params, param_name, required)
+    if value is None or value is '':
+        return value
+    try:
+        return get_reference_instance(model_class, value)
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError(
+            '\'%s\' is not a valid `%s`' % (value, param_name)
+        )
+
+
+def get_scheme_or_404(scheme_pk):
+    try:
+        return get_reference_instance(Scheme, scheme_pk)
+    except (KeyError, TypeError, ValueError):
+        raise Http404('No Scheme matches the given query.')
+
+
+def get_fee_types_param(params, param_name, required=False):
+    code = get_param(params, param_name, required)
+    if code is None or code is '':
+        return code
+    fee_types = get_fee_type_index().get_fee_types(str(code))
+    if not fee_types:
+        raise ValidationError(
+            '\'%s\' is not a valid `%s`' % (code, param_name)
+        )
+    return fee_types
+
+
+def get_unique_fee_type(scheme, code):
+    matching_fee_types = get_fee_type_index().get_fee_types(code, scheme=scheme)
+    if len(matching_fee_types) != 1:
+        raise ValidationError((
+            'fee_type_code must match a unique fee type for the scheme; '
+            '{} were found'
+        ).format(len(matching_fee_types)))
+    return matching_fee_types[0]
+
+
+def get_date_param(params, param_name, required=False):
+    value = get_param(params, param_name, required)
+    if value is None or value is '':
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError(
+            '`%s` should be in the format YYYY-MM-DD' % param_name
+        )
+
+
+def get_scheme_type_param(params, param_name, required=False):
+    value = get_param(params, param_name, required)
+    if value is None or value is '':
+        return value
     try:
-        if result is not None and result is not '':
-            if many:
-                candidates = model_class.objects.filter(**{lookup: result})
-                if len(candidates) == 0:
-                    raise model_class.DoesNotExist
-                else:
-                    result = candidates
-            else:
-                result = model_class.objects.get(**{lookup: result})
-    except (model_class.DoesNotExist, ValueError):
+        return SCHEME_TYPE.for_constant(value.upper()).value
+    except KeyError:
         raise ValidationError(
-            '\'%s\' is not a valid `%s`' % (result, param_name)
+            '`%s` should be one of: [%s]'
+            % (param_name, ', '.join(SCHEME_TYPE.constants))
         )
-    return result
 
 
-def get_decimal_param(request, param_name, required=False, default=None):
-    number = get_param(request, param_name, required, default)
+def get_scheme_by_date(params):
+    scheme_type = get_scheme_type_param(params, 'scheme_type', required=True)
+    case_date = get_date_param(params, 'case_date', required=True)
+    schemes = get_scheme_date_index().get_schemes(case_date, scheme_type)
+    if len(schemes) != 1:
+        raise ValidationError((
+            'scheme_type and case_date must match a unique scheme; '
+            '{} were found'
+        ).format(len(schemes)))
+    return schemes[0]
+
+
+def get_boolean_param(params, param_name):
+    value = get_param(params, param_name)
+    if value is None or value is '':
+        return False
+    if str(value).lower() in ('1', 'true'):
+        return True
+    if str(value).lower() in ('0', 'false'):
+        return False
+    raise ValidationError('`%s` should be one of: [1, 0]' % param_name)
+
+
+def get_decimal_param(params, param_name, required=False, default=None):
+    number = get_param(params, param_name, required, default)
     try:
         if number is not None and number is not '':
-            number = Decimal(number)
+            number = Decimal(str(number))
     except InvalidOperation:
         raise ValidationError('`%s` must be a number' % param_name)
     return number
 
 
-class OrderedReadOnlyModelViewSet(viewsets.ReadOnlyModelViewSet):
+def get_count_param(params, param_name):
+    count = get_decimal_param(params, param_name)
+    if count is None or count is '' or not count.is_finite():
+        raise ValidationError('`%s` must be a number' % param_name)
+    return count
+
+
+def check_calculation_params(params):
+    """
+    Reject the values of a calculation given as JSON which couldn't have
+    been given as query parameters
+    """
+    for param_name, value in params.items():
+        if value is None or isinstance(value, (dict, list)):
+            raise ValidationError(
+                '`%s` must be a string or a number' % param_name
+            )
+
+
+class CalculatorLookups():
+    """
+    The units and modifier types that calculations may give counts of,
+    fetched once for a batch of calculations.
+    """
+
+    def __init__(self):
+        self.units = get_units()
+        self.modifier_types = get_modifier_types()
+
+
+def get_calculation_from_params(scheme, params, lookups, timer=null_timer):
+    """
+    Get the arguments of `calculate_total` for the given calculator
+    parameters, timing the parsing of parameters and the resolution of the
+    fee type with `timer`
+    """
+    with timer.stage('params'):
+        fee_types = get_fee_types_param(params, 'fee_type_code', required=True)
+        scenario = get_reference_param(params, 'scenario', Scenario, required=True)
+        advocate_type = get_reference_param(params, 'advocate_type', AdvocateType)
+        offence_class = get_reference_param(params, 'offence_class', OffenceClass)
+
+        unit_counts = []
+        modifier_counts = []
+        for param in params:
+            if param.upper() in lookups.units:
+                unit_counts.append((
+                    lookups.units[param.upper()],
+                    get_count_param(params, param),
+                ))
+
+            if param.upper() in lookups.modifier_types:
+                modifier_counts.append((
+                    lookups.modifier_types[param.upper()],
+                    get_count_param(params, param),
+                ))
+
+    with timer.stage('fee_type'):
+        unique_fee_type = get_unique_fee_type(scheme, fee_types[0].code)
+
+    return (
+        scheme, scenario, unique_fee_type, offence_class, advocate_type,
+        unit_counts, modifier_counts
+    )
+
+
+def calculate_from_params(scheme, params, lookups):
+    return calculation_cache.calculate_total(
+        *get_calculation_from_params(scheme, params, lookups)
+    )
+
+
+def explain_from_params(scheme, params, lookups, timer):
+    return explain_total(
+        *get_calculation_from_params(scheme, params, lookups, timer),
+        timer=timer
+    )
+
+
+class DataVersionConditionalMixin():
+    """
+    Responses depend only on the request and the scheme data, so they are
+    identified by an ETag derived from the data version and the normalized
+    request. Conditional requests for unchanged data get a 304 without
+    running the view.
+    """
+
+    def get_etag(self, request, data_version):
+        key = '\n'.join([
+            data_version.version,
+            request.path,
+            urlencode(sorted(request.GET.lists()), doseq=True),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        return quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        data_version = get_data_version()
+        etag = self.get_etag(request, data_version)
+        last_modified = None
+        if data_version.modified:
+            last_modified = timegm(data_version.modified.utctimetuple())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if not (
+            status.is_success(response.status_code) or
+            response.status_code == status.HTTP_304_NOT_MODIFIED
+        ):
+            return response
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(
+            response, public=True, max_age=settings.DATA_CACHE_MAX_AGE
+        )
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class OrderedReadOnlyModelViewSet(DataVersionConditionalMixin, viewsets.ReadOnlyModelViewSet):
     default_ordering = None
 
     def filter_queryset(self, queryset):
@@ -106,16 +333,11 @@ class SchemeViewSet(OrderedReadOnlyModelViewSet):
         case_date = self.request.query_params.get('case_date')
 
         if case_date:
-            try:
-                case_date = datetime.strptime(case_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError(
-                    '`case_date` should be in the format YYYY-MM-DD'
-                )
-            queryset = queryset.filter(
-                Q(end_date__isnull=True) | Q(end_date__gte=case_date),
-                start_date__lte=case_date
-            )
+            case_date = get_date_param(self.request.query_params, 'case_date')
+            queryset = queryset.filter(pk__in=[
+                scheme.pk
+                for scheme in get_scheme_date_index().get_schemes(case_date)
+            ])
 
         if base_type:
             try:
@@ -131,15 +353,32 @@ class SchemeViewSet(OrderedReadOnlyModelViewSet):
 
 
 class NestedSchemeMixin():
-    scheme_relation_name = 'prices__scheme'
+    """
+    Limits a viewset to the instances used by the prices of the scheme in
+    the URL, either by filtering on `scheme_relation_name` or, if that is
+    not set, by id from the scheme membership index.
+    """
+    scheme_relation_name = None
+
+    def get_scheme(self, scheme_pk):
+        if not hasattr(self, 'scheme'):
+            self.scheme = get_object_or_404(Scheme, pk=scheme_pk)
+        return self.scheme
 
     def get_scheme_queryset(self, scheme_pk):
-        scheme = get_object_or_404(Scheme, pk=scheme_pk)
-        queryset = self.get_queryset().filter(
-            **{'{relation}'.format(relation=self.scheme_relation_name): scheme}
-        ).distinct()
+        scheme = self.get_scheme(scheme_pk)
+        queryset = self.get_queryset()
+        if self.scheme_relation_name:
+            queryset = queryset.filter(**{self.scheme_relation_name: scheme})
+        else:
+            queryset = queryset.filter(
+                pk__in=self.get_member_ids(scheme, queryset.model)
+            )
         return self.filter_queryset(queryset)
 
+    def get_member_ids(self, scheme, model):
+        return get_scheme_membership().get_ids(scheme, model)
+
     def list(self, request, scheme_pk=None):
         queryset = self.get_scheme_queryset(scheme_pk)
 
@@ -163,6 +402,8 @@ class NestedSchemeMixin():
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['scheme_pk'] = self.kwargs.get('scheme_pk')
+        if hasattr(self, 'scheme'):
+            context['scheme'] = self.scheme
         return context
 
 
@@ -197,49 +438,20 @@ class BasePriceFilteredViewSet(NestedSchemeMixin, OrderedReadOnlyModelViewSet):
             'description': '',
         }),
     ])
-    relation_name = NotImplemented
-    lookup_attr = 'pk'
 
-    def filter_queryset(self, queryset):
-        queryset = super().filter_queryset(queryset)
-
-        fee_types = get_model_param(
-            self.request, 'fee_type_code', FeeType, lookup='code', many=True
-        )
-        scenario = get_model_param(self.request, 'scenario', Scenario)
-        advocate_type = get_model_param(self.request, 'advocate_type', AdvocateType)
-        offence_class = get_model_param(self.request, 'offence_class', OffenceClass)
-
-        filters = []
-        if scenario:
-            filters.append(Q(scenario=scenario))
-        if advocate_type:
-            filters.append(
-                Q(advocate_type=advocate_type) |
-                Q(advocate_type__isnull=True)
-            )
-        if offence_class:
-            filters.append(
-                Q(offence_class=offence_class) |
-                Q(offence_class__isnull=True)
+    def get_member_ids(self, scheme, model):
+        params = self.request.query_params
+        return get_scheme_membership().get_ids(
+            scheme, model,
+            fee_types=get_fee_types_param(params, 'fee_type_code'),
+            scenario=get_reference_param(params, 'scenario', Scenario),
+            advocate_type=get_reference_param(
+                params, 'advocate_type', AdvocateType
+            ),
+            offence_class=get_reference_param(
+                params, 'offence_class', OffenceClass
             )
-        if fee_types:
-            filters.append(
-                Q(fee_type__in=fee_types)
-            )
-
-        if filters:
-            filters.append(Q(scheme_id=self.kwargs['scheme_pk']))
-            applicable_prices = Price.objects.filter(*filters)
-            relevant_values = applicable_prices.values_list(
-                self.relation_name, flat=True
-            ).distinct()
-            queryset = queryset.filter(
-                **{'{lookup_attr}__in'.format(
-                    lookup_attr=self.lookup_attr
-                ): relevant_values}
-            )
-        return queryset
+        )
 
 
 class FeeTypeViewSet(BasePriceFilteredViewSet):
@@ -250,7 +462,6 @@ class FeeTypeViewSet(BasePriceFilteredViewSet):
     serializer_class = FeeTypeSerializer
     filter_backends = (backends.DjangoFilterBackend,)
     filter_class = FeeTypeFilter
-    relation_name = 'fee_type'
 
 
 class UnitViewSet(BasePriceFilteredViewSet):
@@ -259,7 +470,6 @@ class UnitViewSet(BasePriceFilteredViewSet):
     """
     queryset = Unit.objects.all()
     serializer_class = UnitSerializer
-    relation_name = 'unit'
 
 
 class ModifierTypeViewSet(BasePriceFilteredViewSet):
@@ -268,9 +478,6 @@ class ModifierTypeViewSet(BasePriceFilteredViewSet):
     """
     queryset = ModifierType.objects.all()
     serializer_class = ModifierTypeSerializer
-    relation_name = 'modifiers'
-    lookup_attr = 'values__pk'
-    scheme_relation_name = 'values__prices__scheme'
 
 
 class ScenarioViewSet(NestedSchemeMixin, OrderedReadOnlyModelViewSet):
@@ -302,25 +509,103 @@ class PriceViewSet(NestedSchemeMixin, OrderedReadOnlyModelViewSet):
     """
     Viewing price(s).
     """
-    queryset = Price.objects.all()
+    queryset = Price.objects.all().prefetch_related('modifiers__modifier_type')
     serializer_class = PriceSerializer
     filter_backends = (backends.DjangoFilterBackend,)
     filter_class = PriceFilter
     scheme_relation_name = 'scheme'
+    export_chunk_size = 2000
+
+    def iterate_prices(self, queryset):
+        """
+        Iterate over prices with a server-side cursor, prefetching modifiers
+        a chunk at a time so that memory use doesn't grow with the scheme.
+        """
+        queryset = queryset.prefetch_related(None)
+        chunk = []
+        for price in queryset.iterator(chunk_size=self.export_chunk_size):
+            chunk.append(price)
+            if len(chunk) == self.export_chunk_size:
+                prefetch_related_objects(chunk, 'modifiers__modifier_type')
+                yield from chunk
+                chunk = []
+        prefetch_related_objects(chunk, 'modifiers__modifier_type')
+        yield from chunk
+
+    @action(
+        detail=False, renderer_classes=(NDJSONRenderer, CSVRenderer),
+        content_negotiation_class=FallbackContentNegotiation
+    )
+    def export(self, request, scheme_pk=None):
+        """
+        Export all prices of the fee scheme matching the filters, unpaginated,
+        as newline delimited JSON (`?format=ndjson`) or CSV (`?format=csv`).
+        """
+        queryset = self.get_scheme_queryset(scheme_pk)
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(price)
+            for price in self.iterate_prices(queryset)
+        )
 
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_rows(rows),
+            content_type='{media_type}; charset={charset}'.format(
+                media_type=renderer.media_type, charset=renderer.charset
+            )
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="fee-scheme-{scheme}-prices.{format}"'.format(
+                scheme=self.scheme.pk, format=renderer.format
+            )
+        )
+        return response
 
-class cached_class_property:
-    def __init__(self, getter):
-        self.getter = getter
-        self.cached = None
 
-    def __get__(self, instance, clazz):
-        if self.cached is None:
-            self.cached = self.getter(clazz)
-        return self.cached
+def get_calculator_fields():
+    return [
+        coreapi.Field('fee_type_code', **{
+            'required': True,
+            'location': 'query',
+            'type': 'string',
+            'description': '',
+        }),
+        coreapi.Field('scenario', **{
+            'required': True,
+            'location': 'query',
+            'type': 'integer',
+            'description': '',
+        }),
+        coreapi.Field('advocate_type', **{
+            'required': False,
+            'location': 'query',
+            'type': 'string',
+            'description': (
+                'Note the query will return prices with `advocate_type_id` '
+                'either matching the value or null.'),
+        }),
+        coreapi.Field('offence_class', **{
+            'required': False,
+            'location': 'query',
+            'type': 'string',
+            'description': (
+                'Note the query will return prices with `offence_class_id` '
+                'either matching the value or null.'),
+        }),
+        coreapi.Field('explain', **{
+            'required': False,
+            'location': 'query',
+            'type': 'boolean',
+            'description': (
+                'If 1, also returns the prices and modifiers used in the '
+                'calculation and the time taken by each stage, in '
+                'milliseconds.'),
+        }),
+    ]
 
 
-class CalculatorView(views.APIView):
+class CalculatorView(DataVersionConditionalMixin, views.APIView):
     """
     Calculate total fee amount
     """
@@ -328,88 +613,152 @@ class CalculatorView(views.APIView):
     allowed_methods = ['GET']
     filter_backends = (backends.DjangoFilterBackend,)
 
-    @cached_class_property
-    def schema(cls):
-        return CalculatorSchema(fields=[
-            coreapi.Field('scheme_pk', **{
-                'required': True,
-                'location': 'path',
-                'type': 'integer',
-                'description': '',
-            }),
-            coreapi.Field('fee_type_code', **{
-                'required': True,
-                'location': 'query',
-                'type': 'string',
-                'description': '',
-            }),
-            coreapi.Field('scenario', **{
-                'required': True,
-                'location': 'query',
-                'type': 'integer',
-                'description': '',
-            }),
-            coreapi.Field('advocate_type', **{
-                'required': False,
-                'location': 'query',
-                'type': 'string',
-                'description': (
-                    'Note the query will return prices with `advocate_type_id` '
-                    'either matching the value or null.'),
-            }),
-            coreapi.Field('offence_class', **{
-                'required': False,
-                'location': 'query',
-                'type': 'string',
-                'description': (
-                    'Note the query will return prices with `offence_class_id` '
-                    'either matching the value or null.'),
-            })
-        ])
+    schema = CalculatorSchema(fields=[
+        coreapi.Field('scheme_pk', **{
+            'required': True,
+            'location': 'path',
+            'type': 'integer',
+            'description': '',
+        }),
+    ] + get_calculator_fields())
+
+    def get_scheme(self):
+        return get_scheme_or_404(self.kwargs['scheme_pk'])
+
+    def get_result(self, scheme, amount):
+        return {
+            'amount': amount.quantize(Decimal('0.01'))
+        }
 
     def get(self, *args, **kwargs):
-        scheme = get_object_or_404(Scheme, pk=kwargs['scheme_pk'])
-        fee_types = get_model_param(
-            self.request, 'fee_type_code', FeeType, required=True, lookup='code', many=True
+        params = self.request.query_params
+        if not get_boolean_param(params, 'explain'):
+            scheme = self.get_scheme()
+            amount = calculate_from_params(scheme, params, CalculatorLookups())
+            return Response(self.get_result(scheme, amount))
+
+        timer = StageTimer()
+        with timer.stage('scheme'):
+            scheme = self.get_scheme()
+        explanation = explain_from_params(
+            scheme, params, CalculatorLookups(), timer
         )
-        scenario = get_model_param(self.request, 'scenario', Scenario, required=True)
-        advocate_type = get_model_param(self.request, 'advocate_type', AdvocateType)
-        offence_class = get_model_param(self.request, 'offence_class', OffenceClass)
+        result = self.get_result(scheme, explanation.pop('amount'))
+        result['explanation'] = explanation
+        return Response(result)
 
-        units = Unit.objects.values_list('pk', flat=True)
-        modifiers = ModifierType.objects.values_list('name', flat=True)
-        unit_counts = []
-        modifier_counts = []
-        for param in self.request.query_params:
-            if param.upper() in units:
-                unit_counts.append((
-                    Unit.objects.get(pk=param.upper()),
-                    get_decimal_param(self.request, param),
-                ))
 
-            if param.upper() in modifiers:
-                modifier_counts.append((
-                    ModifierType.objects.get(name=param.upper()),
-                    get_decimal_param(self.request, param),
-                ))
+class CalculatorByDateView(CalculatorView):
+    """
+    Calculate total fee amount using the scheme of the given type in force
+    on the given date
+    """
 
-        matching_fee_types = Price.objects.filter(
-            scheme=scheme, fee_type__in=fee_types
-        ).values_list('fee_type', flat=True).distinct()
+    schema = CalculatorSchema(fields=[
+        coreapi.Field('scheme_type', **{
+            'required': True,
+            'location': 'query',
+            'type': 'string',
+            'description': 'One of: [%s]' % ', '.join(SCHEME_TYPE.constants),
+        }),
+        coreapi.Field('case_date', **{
+            'required': True,
+            'location': 'query',
+            'type': 'string',
+            'description': 'In the format YYYY-MM-DD',
+        }),
+    ] + get_calculator_fields())
 
-        if len(matching_fee_types) != 1:
-            raise ValidationError((
-                'fee_type_code must match a unique fee type for the scheme; '
-                '{} were found'
-            ).format(len(matching_fee_types)))
+    def get_scheme(self):
+        return get_scheme_by_date(self.request.query_params)
 
-        unique_fee_type = FeeType.objects.get(pk=matching_fee_types[0])
+    def get_result(self, scheme, amount):
+        return {
+            'scheme': scheme.pk,
+            'amount': amount.quantize(Decimal('0.01'))
+        }
 
-        amount = calculate_total(
-            scheme, scenario, unique_fee_type, offence_class, advocate_type,
-            unit_counts, modifier_counts
-        )
 
-        return Response({
-            'amount': amount.quantize(Decimal('0.01'))
-        })
+class BatchCalculatorView(views.APIView):
+    """
+    Calculate total fee amounts for a list of calculations. Each calculation
+    takes the same values as the query parameters of the calculate endpoint,
+    plus `scheme` if no scheme is given in the path.
+    """
+
+    allowed_methods = ['POST']
+
+    def post(self, *args, **kwargs):
+        # pick up data changed by another process before the snapshots are
+        # used, whether or not the calculation cache checks the version too
+        get_data_version()
+        calculations = self.request.data
+        if not isinstance(calculations, list):
+            raise ValidationError('Request body must be a list of calculations')
+        if len(calculations) > settings.CALCULATOR_BATCH_LIMIT:
+            raise ValidationError(
+                'No more than {} calculations may be made at once'.format(
+                    settings.CALCULATOR_BATCH_LIMIT
+                )
+            )
+
+        lookups = CalculatorLookups()
+        scheme = None
+        if 'scheme_pk' in kwargs:
+            scheme = get_scheme_or_404(kwargs['scheme_pk'])
+
+        results = []
+        for params in calculations:
+            try:
+                if not isinstance(params, dict):
+                    raise ValidationError('Calculation must be an object')
+                check_calculation_params(params)
+                amount = calculate_from_params(
+                    scheme or get_reference_param(
+                        params, 'scheme', Scheme, required=True
+                    ),
+                    params,
+                    lookups
+                )
+                results.append({'amount': amount.quantize(Decimal('0.01'))})
+            except ValidationError as e:
+                results.append({'errors': e.detail})
+
+        return Response(results)
+
+
+class OpenAPIDocumentView(View):
+    """
+    Serve the OpenAPI document of the API, prebuilt or generated once per
+    data version, as JSON with `?format=openapi` or to clients that don't
+    accept HTML, and otherwise in Swagger UI
+    """
+
+    def get(self, request):
+        document = get_openapi_document()
+        if (
+            request.GET.get('format') == 'openapi' or
+            'text/html' not in request.META.get('HTTP_ACCEPT', '')
+        ):
+            return self.get_document_response(request, document)
+
+        renderer = SwaggerUIRenderer()
+        return render(request, renderer.template, dict(
+            renderer.get_auth_urls(),
+            USE_SESSION_AUTH=swagger_settings.USE_SESSION_AUTH,
+            drs_settings=json.dumps(renderer.get_ui_settings()),
+            spec=document.content.decode('utf-8'),
+        ))
+
+    def get_document_response(self, request, document):
+        response = get_conditional_response(request, etag=document.etag)
+        if response is None:
+            response = HttpResponse(
+                document.content, content_type=OpenAPIRenderer.media_type
+            )
+        response['ETag'] = document.etag
+        patch_cache_control(
+            response, public=True, max_age=settings.OPENAPI_CACHE_MAX_AGE
+        )
+        patch_vary_headers(response, ('Accept',))
+        return response
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.connection.execute(
+                'PRAGMA {name} = {value}'.format(name=name, value=value)
+            )
+
+
+class CalculatorConfig(AppConfig):
+    name = 'calculator'
+
+    def ready(self):
+        connection_created.connect(set_sqlite_pragmas)
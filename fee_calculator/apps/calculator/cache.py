@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from decimal import Decimal
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import calculate_total
+from .snapshot import get_data_version, get_pk, register_snapshot
+
+
+def normalize_count(count):
+    if isinstance(count, Decimal):
+        return count.normalize()
+    return count
+
+
+def get_calculation_key(
+    scheme, scenario, fee_type, offence_class, advocate_type, unit_counts,
+    modifier_counts
+):
+    '''
+    Get a key identifying the result of `calculate_total` for the given
+    arguments, regardless of the order of the unit and modifier counts or
+    the exponent of decimal counts
+    '''
+    return (
+        get_pk(scheme), get_pk(scenario), get_pk(fee_type),
+        get_pk(offence_class), get_pk(advocate_type),
+        tuple(sorted(
+            (unit.pk, normalize_count(count)) for unit, count in unit_counts
+        )),
+        tuple(sorted(
+            (modifier_type.pk, normalize_count(count))
+            for modifier_type, count in modifier_counts
+        )),
+    )
+
+
+class CalculationCache:
+    '''
+    Least recently used cache of `calculate_total` results, limited to
+    `CALCULATION_CACHE_SIZE` entries of up to `CALCULATION_CACHE_TTL`
+    seconds old and emptied when the data version changes.
+
+    If `CALCULATION_CACHE_ALIAS` names one of the `CACHES`, results are also
+    shared through that cache, e.g. with the other workers on the host.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.version = None
+
+    def stats(self):
+        return {
+            'size': len(self.results),
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+        }
+
+    def get_shared_cache(self):
+        if settings.CALCULATION_CACHE_ALIAS:
+            return caches[settings.CALCULATION_CACHE_ALIAS]
+
+    def get_shared_key(self, key, version):
+        return 'calculation:{version}:{key}'.format(
+            version=version,
+            key=hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        )
+
+    def get_local(self, key, version, now):
+        with self.lock:
+            if version != self.version:
+                self.results.clear()
+                self.version = version
+
+            if key in self.results:
+                expires, result = self.results[key]
+                if expires is None or now < expires:
+                    self.results.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self.results[key]
+        return None
+
+    def set_local(self, key, result, version, now):
+        ttl = settings.CALCULATION_CACHE_TTL
+        with self.lock:
+            if version != self.version:
+                # the data changed while calculating
+                return
+            self.results[key] = (now + ttl if ttl else None, result)
+            self.results.move_to_end(key)
+            while len(self.results) > settings.CALCULATION_CACHE_SIZE:
+                self.results.popitem(last=False)
+
+    def calculate_total(self, *args):
+        '''
+        Get the result of `calculate_total(*args)`, from the cache if possible
+        '''
+        if not settings.CALCULATION_CACHE_SIZE:
+            return calculate_total(*args)
+
+        key = get_calculation_key(*args)
+        version = get_data_version().version
+        now = time.monotonic()
+        result = self.get_local(key, version, now)
+        if result is not None:
+            return result
+
+        shared_cache = self.get_shared_cache()
+        if shared_cache is not None:
+            shared_key = self.get_shared_key(key, version)
+            result = shared_cache.get(shared_key)
+            if result is not None:
+                with self.lock:
+                    self.shared_hits += 1
+                self.set_local(key, result, version, now)
+                return result
+
+        with self.lock:
+            self.misses += 1
+        result = calculate_total(*args)
+        self.set_local(key, result, version, now)
+        if shared_cache is not None:
+            shared_cache.set(
+                shared_key, result,
+                timeout=settings.CALCULATION_CACHE_TTL or None
+            )
+        return result
+
+
+calculation_cache = register_snapshot(CalculationCache())
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connections
+from django.db.transaction import atomic
+
+from calculator.models import Price
+
+
+PriceModifier = Price.modifiers.through
+
+# smaller than the 999 variables sqlite allows in a query, so that the ids of
+# a chunk can be used in one `IN` lookup
+DEFAULT_CHUNK_SIZE = 500
+
+PRICE_EXPONENT = Decimal('0.00001')
+
+
+def get_uplift_multiplier(uplift):
+    '''
+    Multiplier for an uplift given as a percentage, e.g. 2.5 for 2.5%
+    '''
+    return (Decimal('100') + Decimal(uplift)) / Decimal('100')
+
+
+def apply_uplift(value, multiplier):
+    return (value * multiplier).quantize(PRICE_EXPONENT, rounding=ROUND_HALF_UP)
+
+
+def set_inserted_ids(model, objs, using):
+    '''
+    Give objects just inserted with `bulk_create` their ids on databases
+    which can't return the ids of inserted rows, like sqlite, so that rows
+    referring to them can be inserted too. The database assigns the ids as
+    usual, increasing in the order of insertion, and they are read back as
+    the highest ids in the table. Must be called in the transaction of the
+    insert, which holds the database's write lock from the insert on, so
+    that no other process can insert rows in between.
+    '''
+    if connections[using].features.can_return_ids_from_bulk_insert:
+        return
+    ids = model.objects.using(using).order_by('-pk').values_list(
+        'pk', flat=True
+    )[:len(objs)]
+    for obj, pk in zip(objs, reversed(list(ids))):
+        obj.pk = pk
+
+
+def iter_chunks(items, chunk_size):
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def copy_prices(prices, chunk_size=DEFAULT_CHUNK_SIZE, uplift=None, **values):
+    '''
+    Copy the prices of a queryset, along with their modifiers, `chunk_size`
+    prices at a time, with one insert for the prices and one for their
+    modifiers per chunk. `values` are set on every copy, e.g. `scheme` to
+    copy the prices to another scheme, and a percentage `uplift` is applied
+    to the fixed fee and fee per unit. Returns the number of prices copied.
+
+    Should be called in a transaction, so that a partial copy isn't left
+    behind if one of the inserts fails.
+    '''
+    using = prices.db
+    multiplier = get_uplift_multiplier(uplift) if uplift else None
+    # the ids are read up front so that the copies aren't read back as
+    # they are inserted
+    price_ids = list(prices.order_by('pk').values_list('pk', flat=True))
+
+    for chunk_ids in iter_chunks(price_ids, chunk_size):
+        copies = list(Price.objects.using(using).filter(pk__in=chunk_ids))
+        source_ids = [price.pk for price in copies]
+        for price in copies:
+            price.pk = None
+            for name, value in values.items():
+                setattr(price, name, value)
+            if multiplier is not None:
+                price.fixed_fee = apply_uplift(price.fixed_fee, multiplier)
+                price.fee_per_unit = apply_uplift(price.fee_per_unit, multiplier)
+
+        with atomic(using=using):
+            Price.objects.using(using).bulk_create(copies, batch_size=chunk_size)
+            set_inserted_ids(Price, copies, using)
+        new_ids = {
+            source_id: price.pk for source_id, price in zip(source_ids, copies)
+        }
+
+        PriceModifier.objects.using(using).bulk_create([
+            PriceModifier(price_id=new_ids[price_id], modifier_id=modifier_id)
+            for price_id, modifier_id in PriceModifier.objects.using(
+                using
+            ).filter(price_id__in=chunk_ids).values_list(
+                'price_id', 'modifier_id'
+            )
+        ], batch_size=chunk_size)
+
+    return len(price_ids)
+
+
+class AmbiguousSourceError(Exception):
+    pass
+
+
+class MissingSourceError(Exception):
+    pass
+
+
+def derive_prices(
+    targets, sources, match, fields, percentage=Decimal('100'),
+    chunk_size=DEFAULT_CHUNK_SIZE, require_source=False
+):
+    '''
+    Set `fields` of each of the `targets` prices to `percentage` of those of
+    the source price with the same values of the `match` fields, e.g.
+    `advocate_type` and `offence_class`, where null matches null. Both sets
+    of prices are read with one query each and the changed prices written
+    with one update per chunk. Targets without a source are left as they
+    are, unless `require_source` is set, when `MissingSourceError` is raised
+    before any are changed. Returns the prices changed, and raises
+    `AmbiguousSourceError` if two source prices have the same values of the
+    `match` fields.
+    '''
+    multiplier = Decimal(percentage) / Decimal('100')
+    source_values = {}
+    for values in sources.values(*(list(match) + list(fields))):
+        key = tuple(values[name] for name in match)
+        if key in source_values:
+            raise AmbiguousSourceError(
+                'More than one source price has {}'.format(
+                    dict(zip(match, key))
+                )
+            )
+        source_values[key] = values
+
+    changed = []
+    for price in targets.order_by('pk'):
+        key = tuple(price.serializable_value(name) for name in match)
+        values = source_values.get(key)
+        if values is None:
+            if require_source:
+                raise MissingSourceError(
+                    'No source price has {}'.format(dict(zip(match, key)))
+                )
+            continue
+        derived = {
+            name: apply_uplift(values[name], multiplier) for name in fields
+        }
+        if any(getattr(price, name) != value for name, value in derived.items()):
+            for name, value in derived.items():
+                setattr(price, name, value)
+            changed.append(price)
+
+    Price.objects.using(targets.db).bulk_update(
+        changed, fields, batch_size=chunk_size
+    )
+    return changed
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from contextlib import contextmanager
+import time
+
+from .models import calculate_total
+
+
+class StageTimer:
+    '''
+    Accumulates the time spent in each named stage of a calculation, in
+    milliseconds, excluding the time spent in any stages nested within it
+    '''
+
+    def __init__(self):
+        self.timings = OrderedDict()
+        # time spent in the stages nested within each stage in progress
+        self.nested = []
+
+    @contextmanager
+    def stage(self, name):
+        self.timings.setdefault(name, 0)
+        self.nested.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start)*1000
+            self.timings[name] += duration - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += duration
+
+
+class NullStageTimer:
+    '''
+    A `StageTimer` that doesn't time anything, for calculations that aren't
+    being explained
+    '''
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+
+null_timer = NullStageTimer()
+
+
+class Explanation:
+    '''
+    Collects the prices matched by `calculator.models.calculate_total`,
+    with the modifiers applied to each in order of priority, and how the
+    amounts for each unit were aggregated, timing the arithmetic with `timer`
+    '''
+
+    def __init__(self, timer=null_timer):
+        self.timer = timer
+        self.prices = []
+        self.aggregation = None
+
+    def calculate_price_total(self, price, unit, unit_count, modifier_counts):
+        with self.timer.stage('arithmetic'):
+            steps = []
+            amount = price.calculate_total(
+                unit_count, modifier_counts, steps=steps
+            )
+            applicable = price.is_applicable(unit_count)
+            self.prices.append(OrderedDict([
+                ('price', price.pk),
+                ('unit', unit.pk),
+                ('unit_count', unit_count),
+                ('applicable', applicable),
+                ('applicable_unit_count', (
+                    price.get_applicable_unit_count(unit_count)
+                    if applicable else 0
+                )),
+                ('modifiers', steps),
+                ('amount', amount),
+            ]))
+        return amount
+
+
+def explain_total(
+    scheme, scenario, fee_type, offence_class, advocate_type, unit_counts,
+    modifier_counts, timer=None
+):
+    '''
+    Calculate the total with `calculator.models.calculate_total`, and also
+    return the prices matched for each unit, the modifiers applied to each
+    price in order of priority, how the amounts were aggregated and the time
+    taken to look up prices and to do the arithmetic
+    '''
+    timer = timer or StageTimer()
+    explanation = Explanation(timer)
+
+    # the time spent on the calculation other than the arithmetic is almost
+    # all spent finding prices
+    with timer.stage('price_lookup'):
+        total = calculate_total(
+            scheme, scenario, fee_type, offence_class, advocate_type,
+            unit_counts, modifier_counts, explanation=explanation
+        )
+
+    return OrderedDict([
+        ('amount', total),
+        ('prices', explanation.prices),
+        ('aggregation', explanation.aggregation),
+        ('timings', OrderedDict(
+            (name, round(duration, 3))
+            for name, duration in timer.timings.items()
+        )),
+    ])
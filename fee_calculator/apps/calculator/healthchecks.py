@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from django.db import DatabaseError, connection
+from moj_irat.healthchecks import HealthcheckResponse
+
+
+def database_healthcheck():
+    '''
+    Check the default database using the connection that requests use,
+    which is kept open between requests for `CONN_MAX_AGE` seconds, so that
+    frequent checks don't each open a new connection. A connection that
+    fails the check is closed so that the next request opens a new one.
+    '''
+    reused = connection.connection is not None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except DatabaseError:
+        connection.close()
+        raise
+    return HealthcheckResponse(
+        database_healthcheck.name, True, vendor=connection.vendor,
+        reused_connection=reused
+    )
+
+
+database_healthcheck.name = 'database'
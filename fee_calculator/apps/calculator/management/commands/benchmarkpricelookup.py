@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from calculator.models import AdvocateType, OffenceClass, Price
+
+
+def get_price_lookup(
+    scheme, scenario, fee_type, unit, advocate_type, offence_class
+):
+    '''
+    Query for the prices of a calculation, as found in memory by
+    `calculator.snapshot.PriceTable.get_prices` and in the database by the
+    price endpoint's filters, where prices with no `advocate_type` or
+    `offence_class` match any value
+    '''
+    return Price.objects.filter(
+        scheme=scheme, scenario=scenario, fee_type=fee_type, unit=unit
+    ).filter(
+        Q(advocate_type__isnull=True) | Q(advocate_type=advocate_type)
+    ).filter(
+        Q(offence_class__isnull=True) | Q(offence_class=offence_class)
+    )
+
+
+class Command(BaseCommand):
+    help = '''
+        Show the query plan and time the database lookup of the prices for
+        each combination of scheme, scenario, fee type, unit, advocate type
+        and offence class in the loaded prices. To compare plans before and
+        after an index is added, run it at each migration.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample', type=int,
+            help='Number of lookups to time, chosen at random (default: all)'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of times to repeat each lookup'
+        )
+
+    def handle(self, *args, **options):
+        lookups = list(Price.objects.values_list(
+            'scheme', 'scenario', 'fee_type', 'unit', 'advocate_type',
+            'offence_class'
+        ).distinct())
+        if not lookups:
+            raise CommandError('No prices are loaded')
+        if options['sample'] and options['sample'] < len(lookups):
+            lookups = random.Random(0).sample(lookups, options['sample'])
+
+        # prices with no advocate type or offence class are looked up with
+        # any value, which they match along with the prices for that value
+        default_advocate_type = AdvocateType.objects.order_by('pk').first()
+        default_offence_class = OffenceClass.objects.order_by('pk').first()
+        queries = [
+            get_price_lookup(
+                scheme, scenario, fee_type, unit,
+                advocate_type or default_advocate_type,
+                offence_class or default_offence_class
+            ).values_list('pk').query.sql_with_params()
+            for scheme, scenario, fee_type, unit, advocate_type, offence_class
+            in lookups
+        ]
+
+        self.stdout.write(get_price_lookup(
+            *lookups[0][:4], default_advocate_type, default_offence_class
+        ).explain())
+
+        durations = []
+        with connection.cursor() as cursor:
+            for _ in range(options['repeat']):
+                for sql, params in queries:
+                    start = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    durations.append(time.perf_counter() - start)
+
+        durations.sort()
+        self.stdout.write(
+            '{lookups} lookups on {vendor}: mean {mean:.3f}ms, median '
+            '{median:.3f}ms, 99th percentile {p99:.3f}ms'.format(
+                lookups=len(durations), vendor=connection.vendor,
+                mean=sum(durations)*1000/len(durations),
+                median=durations[len(durations)//2]*1000,
+                p99=durations[int(len(durations)*0.99)]*1000
+            )
+        )
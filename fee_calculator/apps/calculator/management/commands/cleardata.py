@@ -5,6 +5,7 @@ from calculator.models import (
     Scheme, Scenario, ScenarioCode, AdvocateType, FeeType, OffenceClass, Unit,
     Modifier, ModifierType, Price
 )
+from calculator.snapshot import update_data_version
 
 
 def print_deleted_info(results):
@@ -31,3 +32,4 @@ class Command(BaseCommand):
         print_deleted_info(ScenarioCode.objects.all().delete())
         print_deleted_info(Scenario.objects.all().delete())
         print_deleted_info(Scheme.objects.all().delete())
+        update_data_version()
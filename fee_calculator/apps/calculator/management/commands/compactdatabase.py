@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import os
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = '''
+        Compact a sqlite database and gather statistics on its indexes for
+        the query planner, so that it can be served as a read-only snapshot
+        with `DB_SNAPSHOT=True`
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to compact (default: "default")'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Only sqlite databases can be compacted')
+
+        with connection.cursor() as cursor:
+            # keep everything in the database file, which a snapshot opened
+            # with `immutable=1` requires
+            cursor.execute('PRAGMA journal_mode = DELETE')
+            cursor.execute('ANALYZE')
+            cursor.execute('VACUUM')
+            cursor.execute('PRAGMA integrity_check')
+            result = cursor.fetchone()[0]
+        connection.close()
+        if result != 'ok':
+            raise CommandError('Integrity check failed: {}'.format(result))
+
+        if options['verbosity'] >= 1:
+            path = connection.settings_dict['NAME']
+            self.stdout.write('Compacted {path} to {size} bytes'.format(
+                path=path, size=os.path.getsize(path)
+            ))
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 from django.core.management import BaseCommand
+from django.db.models import Count
 from django.db.transaction import atomic
 
+from calculator.copying import DEFAULT_CHUNK_SIZE, PriceModifier, copy_prices
 from calculator.models import (
     Scheme, FeeType, Price, Unit
 )
+from calculator.snapshot import update_data_version
 
 
 class Command(BaseCommand):
@@ -37,6 +40,14 @@ class Command(BaseCommand):
             '-u', '--unit', type=str,
             help='[optional] ID of the unit for the feetype prices if different from source'
         )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='[optional] Show the prices that would be created without creating them'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Number of prices to insert at a time'
+        )
 
     def handle(self, *args, **options):
         source_fee_type = FeeType.objects.get(pk=options['source_feetype_id'])
@@ -44,14 +55,51 @@ class Command(BaseCommand):
         new_fee_type = FeeType.objects.get(pk=options['new_feetype_id'])
         new_scheme = Scheme.objects.get(pk=options['new_scheme_id'])
 
+        values = {'fee_type': new_fee_type, 'scheme': new_scheme}
+        if options['unit']:
+            values['unit'] = Unit.objects.get(pk=options['unit'])
+
+        prices = Price.objects.filter(fee_type=source_fee_type, scheme=source_scheme)
+
+        if options['dry_run']:
+            self.show_diff(prices, **values)
+            return
+
         with atomic():
-            for price in Price.objects.filter(fee_type=source_fee_type, scheme=source_scheme):
-                modifiers = list(price.modifiers.all())
-                price.id = None
-                price.fee_type = new_fee_type
-                price.scheme = new_scheme
-                if options['unit']:
-                    price.unit = Unit.objects.get(pk=options['unit'])
-
-                price.save()
-                price.modifiers.add(*modifiers)
+            copied = copy_prices(prices, chunk_size=options['chunk_size'], **values)
+        update_data_version()
+        self.stdout.write('Created {copied} prices for {fee_type} in {scheme}'.format(
+            copied=copied, fee_type=new_fee_type, scheme=new_scheme
+        ))
+
+    def show_diff(self, prices, fee_type, scheme, unit=None):
+        '''
+        Write the number of prices that would be created for each scenario
+        and unit, next to the number the new fee type already has
+        '''
+        existing = {
+            (row['scenario__name'], row['unit']): row['count']
+            for row in Price.objects.filter(
+                fee_type=fee_type, scheme=scheme
+            ).values('scenario__name', 'unit').annotate(count=Count('pk'))
+        }
+        created = {}
+        for row in prices.values('scenario__name', 'unit').annotate(count=Count('pk')):
+            key = (row['scenario__name'], unit.pk if unit else row['unit'])
+            created[key] = created.get(key, 0) + row['count']
+
+        self.stdout.write('Prices for {fee_type} in {scheme}:'.format(
+            fee_type=fee_type, scheme=scheme
+        ))
+        for scenario, unit_id in sorted(set(existing) | set(created)):
+            self.stdout.write('  {scenario} / {unit}: {existing} existing, +{created}'.format(
+                scenario=scenario, unit=unit_id,
+                existing=existing.get((scenario, unit_id), 0),
+                created=created.get((scenario, unit_id), 0)
+            ))
+        self.stdout.write(
+            'Would create {prices} prices with {modifiers} modifiers'.format(
+                prices=sum(created.values()),
+                modifiers=PriceModifier.objects.filter(price__in=prices).count()
+            )
+        )
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
+from decimal import Decimal
+
 from django.core.management import BaseCommand
+from django.db.models import Q
 from django.db.transaction import atomic
 
+from calculator.copying import DEFAULT_CHUNK_SIZE, copy_prices
 from calculator.models import (
     Price, Scheme
 )
+from calculator.snapshot import update_data_version
 
 
 class Command(BaseCommand):
@@ -12,7 +17,9 @@ class Command(BaseCommand):
         Create a new fee scheme based on an existing one. Provide the ID of the
         source scheme and the new scheme, and the prices for the source scheme
         will be copied to the new scheme. You must have already created a
-        Scheme record for the new scheme.
+        Scheme record for the new scheme. The prices copied can be limited to
+        some fee types, scenarios or offence classes, and increased by a
+        percentage uplift.
     '''
 
     def add_arguments(self, parser):
@@ -24,15 +31,49 @@ class Command(BaseCommand):
             'new_scheme_id', type=int,
             help='ID of the scheme to copy prices to'
         )
+        parser.add_argument(
+            '--fee-type', type=int, nargs='+', dest='fee_types',
+            help='[optional] IDs of the fee types to copy prices for'
+        )
+        parser.add_argument(
+            '--scenario', type=int, nargs='+', dest='scenarios',
+            help='[optional] IDs of the scenarios to copy prices for'
+        )
+        parser.add_argument(
+            '--offence-class', nargs='+', dest='offence_classes',
+            help='[optional] IDs of the offence classes to copy prices for, along with prices for any offence class'
+        )
+        parser.add_argument(
+            '--uplift', type=Decimal,
+            help='[optional] Percentage to increase the fixed fee and fee per unit of the copied prices by, e.g. 2.5'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Number of prices to insert at a time'
+        )
 
     def handle(self, *args, **options):
         source_scheme = Scheme.objects.get(pk=options['source_scheme_id'])
         new_scheme = Scheme.objects.get(pk=options['new_scheme_id'])
 
+        prices = Price.objects.filter(scheme=source_scheme)
+        if options['fee_types']:
+            prices = prices.filter(fee_type__in=options['fee_types'])
+        if options['scenarios']:
+            prices = prices.filter(scenario__in=options['scenarios'])
+        if options['offence_classes']:
+            # prices with no offence class apply to every offence class
+            prices = prices.filter(
+                Q(offence_class__isnull=True) |
+                Q(offence_class__in=options['offence_classes'])
+            )
+
         with atomic():
-            for price in Price.objects.filter(scheme=source_scheme):
-                modifiers = list(price.modifiers.all())
-                price.id = None
-                price.scheme = new_scheme
-                price.save()
-                price.modifiers.add(*modifiers)
+            copied = copy_prices(
+                prices, chunk_size=options['chunk_size'],
+                uplift=options['uplift'], scheme=new_scheme
+            )
+        update_data_version()
+        self.stdout.write('Copied {copied} prices from {source} to {new}'.format(
+            copied=copied, source=source_scheme, new=new_scheme
+        ))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+
+from django.core.management import BaseCommand, CommandError
+from django.db.transaction import atomic, set_rollback
+
+from calculator.copying import (
+    DEFAULT_CHUNK_SIZE, AmbiguousSourceError, MissingSourceError,
+    derive_prices
+)
+from calculator.models import (
+    Scheme, Scenario, FeeType, Price
+)
+from calculator.snapshot import update_data_version
+
+
+MATCH_FIELDS = [
+    'advocate_type', 'offence_class', 'unit', 'limit_from', 'limit_to',
+    'strict_range'
+]
+DERIVED_FIELDS = ['fixed_fee', 'fee_per_unit']
+
+
+class Command(BaseCommand):
+    help = '''
+        Set the fees of the prices of a scheme, scenario and fee type to a
+        percentage of those of the equivalent prices of another scheme,
+        scenario or fee type, in a single transaction. Equivalent prices have
+        the same values of the `--match` fields. The source scheme, scenario
+        and fee type default to those of the target, so give at least one.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scheme_id', type=int,
+            help='ID of the scheme of the prices to update'
+        )
+        parser.add_argument(
+            'scenario_id', type=int,
+            help='ID of the scenario of the prices to update'
+        )
+        parser.add_argument(
+            'feetype_id', type=int,
+            help='ID of the fee type of the prices to update'
+        )
+        parser.add_argument(
+            '--source-scheme', type=int,
+            help='[optional] ID of the scheme of the prices to derive them from'
+        )
+        parser.add_argument(
+            '--source-scenario', type=int,
+            help='[optional] ID of the scenario of the prices to derive them from'
+        )
+        parser.add_argument(
+            '--source-feetype', type=int,
+            help='[optional] ID of the fee type of the prices to derive them from'
+        )
+        parser.add_argument(
+            '--percentage', type=Decimal, default=Decimal('100'),
+            help='Percentage of the source fees to set, e.g. 100 to copy them'
+        )
+        parser.add_argument(
+            '--field', nargs='+', dest='fields', choices=DERIVED_FIELDS,
+            default=DERIVED_FIELDS,
+            help='Fees to set'
+        )
+        parser.add_argument(
+            '--match', nargs='+', choices=MATCH_FIELDS,
+            default=['advocate_type', 'offence_class', 'unit', 'limit_from'],
+            help='Fields which equivalent prices have the same values of'
+        )
+        parser.add_argument(
+            '--exclude-zero', action='store_true',
+            help='[optional] Only derive prices from source prices with non-zero fees'
+        )
+        parser.add_argument(
+            '--require-source', action='store_true',
+            help='[optional] Fail, changing nothing, if any price has no equivalent source price'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='[optional] Show the number of prices that would change without changing them'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Number of prices to update at a time'
+        )
+
+    def handle(self, *args, **options):
+        scheme = Scheme.objects.get(pk=options['scheme_id'])
+        scenario = Scenario.objects.get(pk=options['scenario_id'])
+        fee_type = FeeType.objects.get(pk=options['feetype_id'])
+        source_scheme = Scheme.objects.get(pk=options['source_scheme'] or scheme.pk)
+        source_scenario = Scenario.objects.get(pk=options['source_scenario'] or scenario.pk)
+        source_fee_type = FeeType.objects.get(pk=options['source_feetype'] or fee_type.pk)
+        if (source_scheme, source_scenario, source_fee_type) == (scheme, scenario, fee_type):
+            raise CommandError('The source prices must differ from the prices to update')
+
+        targets = Price.objects.filter(
+            scheme=scheme, scenario=scenario, fee_type=fee_type
+        )
+        sources = Price.objects.filter(
+            scheme=source_scheme, scenario=source_scenario,
+            fee_type=source_fee_type
+        )
+        if options['exclude_zero']:
+            for name in options['fields']:
+                sources = sources.exclude(**{name: 0})
+
+        with atomic():
+            changed = self.derive_prices(targets, sources, options)
+            if options['dry_run']:
+                set_rollback(True)
+
+        if options['verbosity'] > 1:
+            for price in changed:
+                self.stdout.write('  {pk}: {values}'.format(pk=price.pk, values=', '.join(
+                    '{}={}'.format(name, getattr(price, name)) for name in options['fields']
+                )))
+        self.stdout.write('{verb} {changed} of {total} prices for {fee_type} in {scheme} / {scenario}'.format(
+            verb='Would change' if options['dry_run'] else 'Changed',
+            changed=len(changed), total=targets.count(), fee_type=fee_type,
+            scheme=scheme, scenario=scenario
+        ))
+        if changed and not options['dry_run']:
+            update_data_version()
+
+    def derive_prices(self, targets, sources, options):
+        try:
+            return derive_prices(
+                targets, sources, options['match'], options['fields'],
+                percentage=options['percentage'],
+                chunk_size=options['chunk_size'],
+                require_source=options['require_source']
+            )
+        except AmbiguousSourceError as e:
+            raise CommandError('{}; add fields to --match'.format(e))
+        except MissingSourceError as e:
+            raise CommandError(e)
@@ -12,9 +12,15 @@ from django.db import (
 )
 from django.utils.encoding import force_text
 
+from calculator.snapshot import update_data_version
+
 
 class Command(LoadDataCommand):
 
+    def handle(self, *fixture_labels, **options):
+        super().handle(*fixture_labels, **options)
+        update_data_version()
+
     def load_label(self, fixture_label):
         """
         Loads fixtures files for a given label. This method is largely copied
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-17 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0027_auto_20181122_1057'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(help_text='Changes whenever the scheme data is loaded or modified.', max_length=32)),
+                ('modified', models.DateTimeField()),
+            ],
+        ),
+    ]
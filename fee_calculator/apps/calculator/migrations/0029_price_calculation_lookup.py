@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-17 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0028_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='price',
+            index=models.Index(fields=['scheme', 'scenario', 'fee_type', 'unit', 'advocate_type', 'offence_class'], name='price_calculation_lookup'),
+        ),
+    ]
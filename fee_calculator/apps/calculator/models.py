@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 from decimal import Decimal
 
 from django.db import models
-from django.db.models import Q
+from django.utils.functional import cached_property
 
 from .constants import SCHEME_TYPE, AGGREGATION_TYPE
 from .exceptions import RequiredModifierMissingException
@@ -21,6 +22,16 @@ class Scheme(models.Model):
         return self.description
 
 
+class DataVersion(models.Model):
+    version = models.CharField(max_length=32, help_text=(
+        'Changes whenever the scheme data is loaded or modified.'
+    ))
+    modified = models.DateTimeField()
+
+    def __str__(self):
+        return self.version
+
+
 class Scenario(models.Model):
     name = models.CharField(max_length=255)
 
@@ -93,11 +104,25 @@ def get_value_covered_by_range(value, limit_from, limit_to):
     value_covered = value
     if limit_from:
         if value < limit_from:
-            return Decimal('0')
+            return 0
         value_covered -= (limit_from - 1)
     if limit_to and value > limit_to:
         value_covered -= (value - limit_to)
-    return max(value_covered, Decimal('0'))
+    return max(value_covered, 0)
+
+
+def get_count(value):
+    '''
+    Get a whole number count as an `int`, which is much quicker than
+    `Decimal` to compare with limits and gives exactly the same totals;
+    any other count is returned unchanged
+    '''
+    if (
+        isinstance(value, Decimal) and value.is_finite() and
+        value == value.to_integral_value()
+    ):
+        return int(value)
+    return value
 
 
 class Modifier(models.Model):
@@ -143,19 +168,32 @@ class Modifier(models.Model):
 
     def is_applicable(self, modifier_type, count):
         if self.modifier_type == modifier_type:
-            if self.strict_range:
-                return (
-                    count >= self.limit_from and
-                    (self.limit_to is None or count <= self.limit_to)
-                )
-            else:
-                return count >= self.limit_from
+            return self.is_applicable_to_count(count)
         return False
 
+    def is_applicable_to_count(self, count):
+        if self.strict_range:
+            return (
+                count >= self.limit_from and
+                (self.limit_to is None or count <= self.limit_to)
+            )
+        else:
+            return count >= self.limit_from
+
+    @cached_property
+    def fixed_multiplier(self):
+        return self.fixed_percent/Decimal('100.00')
+
+    @cached_property
+    def per_unit_multiplier(self):
+        return self.percent_per_unit/Decimal('100.00')
+
     def apply(self, count, total):
-        fixed_modifier = total*self.fixed_percent/Decimal('100.00')
+        # dividing by 100 only shifts the exponent, so multiplying by the
+        # precomputed multiplier is exactly `total*fixed_percent/100`
+        fixed_modifier = total*self.fixed_multiplier
         per_unit_modifier = (
-            total*(self.percent_per_unit/Decimal('100.00'))
+            total*self.per_unit_multiplier
         )*self.get_applicable_unit_count(count)
         return fixed_modifier + per_unit_modifier
 
@@ -169,6 +207,46 @@ class Modifier(models.Model):
         )
 
 
+class ModifierTable:
+    '''
+    The modifiers of a price grouped by modifier type and ordered by
+    priority, so that finding those applicable to the given modifier
+    counts is a lookup per count rather than a comparison of every
+    modifier with every count
+    '''
+
+    def __init__(self, modifiers):
+        modifiers = sorted(modifiers, key=lambda modifier: modifier.priority)
+        self.positions = {}
+        self.modifiers_by_type = {}
+        for position, modifier in enumerate(modifiers):
+            self.positions[modifier.pk] = position
+            self.modifiers_by_type.setdefault(
+                modifier.modifier_type_id, []
+            ).append(modifier)
+        self.required = [modifier for modifier in modifiers if modifier.required]
+
+    def get_applicable_modifiers(self, modifier_counts):
+        applicable_modifiers = []
+        for modifier_type, count in modifier_counts:
+            for modifier in self.modifiers_by_type.get(modifier_type.pk, ()):
+                if modifier.is_applicable_to_count(count):
+                    applicable_modifiers.append((modifier, count,))
+
+        if self.required:
+            applied = {modifier.pk for modifier, _ in applicable_modifiers}
+            for modifier in self.required:
+                if modifier.pk not in applied:
+                    raise RequiredModifierMissingException
+
+        if len(applicable_modifiers) > 1:
+            # order as the price's modifiers stably sorted by priority
+            applicable_modifiers.sort(
+                key=lambda modifier: self.positions[modifier[0].pk]
+            )
+        return applicable_modifiers
+
+
 class Price(models.Model):
     scenario = models.ForeignKey('Scenario', related_name='prices', on_delete=models.CASCADE)
     scheme = models.ForeignKey('Scheme', related_name='prices', on_delete=models.CASCADE)
@@ -199,9 +277,27 @@ class Price(models.Model):
     ))
     modifiers = models.ManyToManyField(Modifier, related_name='prices')
 
-    def calculate_total(self, unit_count, modifier_counts):
+    class Meta:
+        indexes = [
+            # matches the lookup of the prices for a calculation, with the
+            # columns that may be null last so that they are compared
+            # within the index rather than by reading each candidate row
+            models.Index(
+                fields=[
+                    'scheme', 'scenario', 'fee_type', 'unit', 'advocate_type',
+                    'offence_class'
+                ],
+                name='price_calculation_lookup'
+            ),
+        ]
+
+    # set by the price table in `calculator.snapshot` for the prices it holds
+    modifier_table = None
+
+    def calculate_total(self, unit_count, modifier_counts, steps=None):
         '''
-        Calculate the total from any fixed_fee, fee_per_unit and modifiers
+        Calculate the total from any fixed_fee, fee_per_unit and modifiers,
+        appending each modifier applied to `steps` if given
         '''
         if not self.is_applicable(unit_count):
             return Decimal(0)
@@ -228,7 +324,16 @@ class Price(models.Model):
                 total += sum(fees)
                 fees = []
                 current_priority = modifier.priority
-            fees.append(modifier.apply(count, total))
+            fee = modifier.apply(count, total)
+            fees.append(fee)
+            if steps is not None:
+                steps.append(OrderedDict([
+                    ('modifier', modifier.pk),
+                    ('modifier_type', modifier.modifier_type_id),
+                    ('priority', modifier.priority),
+                    ('count', count),
+                    ('amount', fee),
+                ]))
         return total + sum(fees)
 
     def is_applicable(self, count):
@@ -245,20 +350,10 @@ class Price(models.Model):
         Get a list of extra fees from associated modifiers for the given
         modifier and count
         '''
-        applicable_modifiers = []
-        # applicability is checked in python on the assumption that the
-        # query for prices will use:
-        # `.prefetch_related('modifiers')`
-        for modifier in self.modifiers.all():
-            modifier_applied = False
-            for modifier_type, count in modifier_counts:
-                modifier_applicable = modifier.is_applicable(modifier_type, count)
-                if modifier_applicable:
-                    modifier_applied = True
-                    applicable_modifiers.append((modifier, count,))
-            if modifier.required and not modifier_applied:
-                raise RequiredModifierMissingException
-        return sorted(applicable_modifiers, key=lambda m: m[0].priority)
+        modifier_table = self.modifier_table
+        if modifier_table is None:
+            modifier_table = ModifierTable(self.modifiers.all())
+        return modifier_table.get_applicable_modifiers(modifier_counts)
 
     def get_applicable_unit_count(self, unit_count):
         '''
@@ -272,28 +367,52 @@ class Price(models.Model):
 
 def calculate_total(
     scheme, scenario, fee_type, offence_class, advocate_type, unit_counts,
-    modifier_counts
+    modifier_counts, explanation=None
 ):
+    '''
+    Calculate the total fee. If an `explanation`, such as a
+    `calculator.explain.Explanation`, is given, the total of each price is
+    calculated by its `calculate_price_total`, and the aggregation of the
+    amounts for each unit is recorded in its `aggregation`.
+    '''
+    from .snapshot import get_price_table
+
+    price_table = get_price_table()
+    modifier_counts = [
+        (modifier_type, get_count(count))
+        for modifier_type, count in modifier_counts
+    ]
     amounts = []
     for unit, unit_count in unit_counts:
-        prices = Price.objects.filter(
-            Q(advocate_type=advocate_type) | Q(advocate_type__isnull=True),
-            Q(offence_class=offence_class) | Q(offence_class__isnull=True),
-            scheme=scheme, fee_type=fee_type, unit=unit,
-            scenario=scenario
-        ).prefetch_related('modifiers')
+        unit_count = get_count(unit_count)
+        prices = price_table.get_prices(
+            scheme, scenario, fee_type, unit,
+            advocate_type=advocate_type, offence_class=offence_class
+        )
 
         if len(prices) > 0:
             # sum total from all prices whose range is covered by the unit_count
-            amounts.append(sum((
-                price.calculate_total(unit_count, modifier_counts)
-                for price in prices
-            )))
+            if explanation is None:
+                amounts.append(sum((
+                    price.calculate_total(unit_count, modifier_counts)
+                    for price in prices
+                )))
+            else:
+                amounts.append(sum((
+                    explanation.calculate_price_total(
+                        price, unit, unit_count, modifier_counts
+                    )
+                    for price in prices
+                )))
+
+    if fee_type.aggregation == AGGREGATION_TYPE.MAX:
+        aggregate, aggregation = max, 'MAX'
+    else:
+        aggregate, aggregation = sum, 'SUM'
+    if explanation is not None:
+        explanation.aggregation = aggregation
 
     if len(amounts) > 0:
-        if fee_type.aggregation == AGGREGATION_TYPE.MAX:
-            return max(amounts)
-        else:
-            return sum(amounts)
+        return aggregate(amounts)
     else:
         return Decimal('0')
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_right
+from collections import defaultdict
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import (
+    DataVersion, Scheme, Scenario, FeeType, AdvocateType, OffenceClass, Price, Unit,
+    ModifierType, ModifierTable, ScenarioCode
+)
+
+
+_snapshots = []
+
+
+class snapshot:
+    '''
+    Lazily build the result of the decorated function once per process and
+    keep it until `clear_snapshots` is called. Reference data only changes
+    when fixtures are (re)loaded, so anything derived from it can be shared
+    between requests.
+    '''
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.lock = threading.Lock()
+        self.value = None
+        register_snapshot(self)
+
+    def __call__(self):
+        value = self.value
+        if value is None:
+            with self.lock:
+                value = self.value
+                if value is None:
+                    value = self.builder()
+                    self.value = value
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.value = None
+
+
+def register_snapshot(cached):
+    '''
+    Have `cached.clear()` called whenever snapshots are cleared
+    '''
+    _snapshots.append(cached)
+    return cached
+
+
+def clear_snapshots():
+    '''
+    Discard all snapshots so that they are rebuilt from the database on next
+    use. Call this after any change to scheme data.
+    '''
+    for cached in _snapshots:
+        cached.clear()
+
+
+class DataVersionTracker:
+    '''
+    Keep the current `DataVersion`, checking the database for a new one at
+    most every `DATA_VERSION_CHECK_INTERVAL` seconds. Snapshots are cleared
+    when the version has changed, so that data modified by another process
+    is picked up, and on the first check, as snapshots built before it may
+    be of any version.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = None
+        self.checked_at = None
+
+    def needs_check(self, now):
+        return (
+            self.checked_at is None or
+            now - self.checked_at >= settings.DATA_VERSION_CHECK_INTERVAL
+        )
+
+    def get(self):
+        now = time.monotonic()
+        if self.needs_check(now):
+            with self.lock:
+                if self.needs_check(now):
+                    latest = (
+                        DataVersion.objects.order_by('-pk').first() or
+                        DataVersion(version='', modified=None)
+                    )
+                    if (
+                        self.current is None or
+                        latest.version != self.current.version
+                    ):
+                        clear_snapshots()
+                    self.current = latest
+                    self.checked_at = now
+        return self.current
+
+    def reset(self):
+        with self.lock:
+            self.checked_at = None
+
+
+data_version_tracker = DataVersionTracker()
+
+
+def get_data_version():
+    return data_version_tracker.get()
+
+
+def update_data_version():
+    '''
+    Record that the scheme data has changed, clearing all snapshots in this
+    process. Other processes will notice the new version when they next
+    check it.
+    '''
+    DataVersion.objects.update_or_create(pk=1, defaults={
+        'version': uuid.uuid4().hex,
+        'modified': timezone.now(),
+    })
+    clear_snapshots()
+    data_version_tracker.reset()
+
+
+def get_pk(obj):
+    return obj.pk if obj is not None else None
+
+
+class SchemeDateIndex:
+    '''
+    Schemes of each base type ordered by start date, for finding the schemes
+    in force on a date
+    '''
+
+    def __init__(self, schemes):
+        self.schemes = defaultdict(list)
+        for scheme in sorted(schemes, key=lambda scheme: (scheme.start_date, scheme.pk)):
+            self.schemes[scheme.base_type].append(scheme)
+        self.start_dates = {
+            base_type: [scheme.start_date for scheme in schemes]
+            for base_type, schemes in self.schemes.items()
+        }
+
+    def get_schemes(self, case_date, base_type=None):
+        '''
+        Get the schemes, of `base_type` if given, in force on `case_date`
+        '''
+        base_types = [base_type] if base_type is not None else self.schemes
+        schemes = []
+        for base_type in base_types:
+            started = bisect_right(self.start_dates.get(base_type, []), case_date)
+            schemes.extend(
+                scheme for scheme in self.schemes.get(base_type, [])[:started]
+                if scheme.end_date is None or scheme.end_date >= case_date
+            )
+        return sorted(schemes, key=lambda scheme: scheme.pk)
+
+
+@snapshot
+def get_scheme_date_index():
+    return SchemeDateIndex(Scheme.objects.all())
+
+
+class PriceTable:
+    '''
+    All prices, along with tables of their modifiers, indexed by
+    `(scheme, scenario, fee_type, unit)`
+    '''
+
+    def __init__(self, prices):
+        self.prices = defaultdict(list)
+        for price in prices:
+            price.modifier_table = ModifierTable(price.modifiers.all())
+            self.prices[(
+                price.scheme_id, price.scenario_id, price.fee_type_id,
+                price.unit_id,
+            )].append(price)
+
+    def get_prices(
+        self, scheme, scenario, fee_type, unit, advocate_type=None,
+        offence_class=None
+    ):
+        '''
+        Get the prices for the given values, where prices with no
+        `advocate_type` or `offence_class` match any value
+        '''
+        candidates = self.prices.get((
+            get_pk(scheme), get_pk(scenario), get_pk(fee_type), get_pk(unit),
+        ), [])
+        advocate_type_id = get_pk(advocate_type)
+        offence_class_id = get_pk(offence_class)
+        return [
+            price for price in candidates
+            if price.advocate_type_id in (None, advocate_type_id) and
+            price.offence_class_id in (None, offence_class_id)
+        ]
+
+
+@snapshot
+def get_price_table():
+    return PriceTable(
+        Price.objects.order_by('pk').prefetch_related(
+            'modifiers__modifier_type'
+        )
+    )
+
+
+@snapshot
+def get_units():
+    '''
+    All units, keyed by upper-cased id
+    '''
+    return {unit.pk.upper(): unit for unit in Unit.objects.order_by('pk')}
+
+
+@snapshot
+def get_modifier_types():
+    '''
+    All modifier types, keyed by upper-cased name
+    '''
+    return {
+        modifier_type.name.upper(): modifier_type
+        for modifier_type in ModifierType.objects.order_by('pk')
+    }
+
+
+class FeeTypeIndex:
+    '''
+    Fee types by code, both overall and for each scheme in which they
+    are priced
+    '''
+
+    def __init__(self, fee_types, scheme_fee_type_ids):
+        self.fee_types = defaultdict(list)
+        self.scheme_fee_types = defaultdict(list)
+        fee_types_by_id = {}
+        for fee_type in fee_types:
+            fee_types_by_id[fee_type.pk] = fee_type
+            self.fee_types[fee_type.code].append(fee_type)
+        for scheme_id, fee_type_id in sorted(scheme_fee_type_ids):
+            fee_type = fee_types_by_id[fee_type_id]
+            self.scheme_fee_types[(scheme_id, fee_type.code)].append(fee_type)
+
+    def get_fee_types(self, code, scheme=None):
+        '''
+        Get the fee types with the given code, limited to those priced in
+        `scheme` if given
+        '''
+        if scheme is None:
+            return self.fee_types.get(code, [])
+        return self.scheme_fee_types.get((get_pk(scheme), code), [])
+
+
+@snapshot
+def get_fee_type_index():
+    return FeeTypeIndex(
+        FeeType.objects.order_by('pk'),
+        Price.objects.values_list('scheme_id', 'fee_type_id').distinct()
+    )
+
+
+@snapshot
+def get_scenario_codes():
+    '''
+    Scenario codes, keyed by `(scenario_id, scheme_type)`
+    '''
+    return {
+        (scenario_code.scenario_id, scenario_code.scheme_type): scenario_code.code
+        for scenario_code in ScenarioCode.objects.all()
+    }
+
+
+@snapshot
+def get_reference_data():
+    '''
+    Schemes, scenarios, advocate types and offence classes, keyed by model
+    and id
+    '''
+    return {
+        model: {instance.pk: instance for instance in model.objects.order_by('pk')}
+        for model in (Scheme, Scenario, AdvocateType, OffenceClass)
+    }
+
+
+class SchemeMembership:
+    '''
+    The ids of the scenarios, fee types, advocate types, offence classes,
+    units and modifier types used by the prices of each scheme, along with
+    the scenario, advocate type, offence class and fee type of those prices
+    so that they can be narrowed down to the prices matching a query
+    '''
+    price_fields = (
+        (Scenario, 'scenario_id'),
+        (FeeType, 'fee_type_id'),
+        (AdvocateType, 'advocate_type_id'),
+        (OffenceClass, 'offence_class_id'),
+        (Unit, 'unit_id'),
+    )
+
+    def __init__(self, prices, price_modifier_types):
+        self.members = defaultdict(set)
+        self.rows = defaultdict(set)
+        for price in prices:
+            key = (
+                price['scenario_id'], price['advocate_type_id'],
+                price['offence_class_id'], price['fee_type_id'],
+            )
+            for model, field in self.price_fields:
+                self.add(model, price['scheme_id'], key, price[field])
+        for price in price_modifier_types:
+            key = (
+                price['scenario_id'], price['advocate_type_id'],
+                price['offence_class_id'], price['fee_type_id'],
+            )
+            self.add(
+                ModifierType, price['scheme_id'], key,
+                price['modifiers__modifier_type_id']
+            )
+
+    def add(self, model, scheme_id, key, value):
+        if value is not None:
+            self.members[(model, scheme_id)].add(value)
+            self.rows[(model, scheme_id)].add(key + (value,))
+
+    def get_ids(
+        self, scheme, model, scenario=None, advocate_type=None,
+        offence_class=None, fee_types=None
+    ):
+        '''
+        Get the ids of the instances of `model` used in `scheme`, limited to
+        those used by prices for `scenario`, `advocate_type` (or none),
+        `offence_class` (or none) and any of `fee_types`, if given
+        '''
+        key = (model, get_pk(scheme))
+        if not (scenario or advocate_type or offence_class or fee_types):
+            return sorted(self.members.get(key, ()))
+
+        scenario_id = get_pk(scenario)
+        advocate_type_ids = (None, get_pk(advocate_type))
+        offence_class_ids = (None, get_pk(offence_class))
+        fee_type_ids = fee_types and {fee_type.pk for fee_type in fee_types}
+        return sorted({
+            value
+            for (
+                price_scenario_id, advocate_type_id, offence_class_id,
+                fee_type_id, value
+            ) in self.rows.get(key, ())
+            if (not scenario or price_scenario_id == scenario_id) and
+            (not advocate_type or advocate_type_id in advocate_type_ids) and
+            (not offence_class or offence_class_id in offence_class_ids) and
+            (not fee_types or fee_type_id in fee_type_ids)
+        })
+
+
+@snapshot
+def get_scheme_membership():
+    fields = (
+        'scheme_id', 'scenario_id', 'advocate_type_id', 'offence_class_id',
+        'fee_type_id',
+    )
+    return SchemeMembership(
+        Price.objects.values(*fields, 'unit_id').distinct(),
+        Price.objects.filter(modifiers__isnull=False).values(
+            *fields, 'modifiers__modifier_type_id'
+        ).distinct()
+    )
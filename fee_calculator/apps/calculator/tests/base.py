@@ -19,9 +19,27 @@ class CalculatorTestCase(TestCase):
             version=settings.API_VERSION, scheme_id=self.scheme_id
         )
 
-    def assertRowValuesCorrect(self, row):
+    def get_row_data(self, row):
+        """
+        Get the calculator parameters for a row of the spreadsheet
+        """
+        return NotImplemented
+
+    def assertAmountCorrect(self, amount, row, data):
+        """
+        Assert an amount calculated with `data` equals the row's fee
+        """
         return NotImplemented
 
+    def assertRowValuesCorrect(self, row):
+        """
+        Assert row values equal calculated values
+        """
+        data = self.get_row_data(row)
+        resp = self.client.get(self.endpoint(), data=data)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.content)
+        self.assertAmountCorrect(resp.data['amount'], row, data)
+
     def check_result(self, data, expected):
         resp = self.client.get(self.endpoint(), data=data)
         self.assertEqual(
@@ -55,6 +73,14 @@ class CalculatorTestCase(TestCase):
         row_test.__doc__ = str(line_number) + ': ' + str(row.get('CASE_ID'))
         return row_test
 
+    @classmethod
+    def get_tested_rows(cls):
+        """
+        Get the line number of each row of the spreadsheet to test, along
+        with the row
+        """
+        return NotImplemented
+
     @classmethod
     def create_tests(cls):
         return NotImplemented
@@ -63,27 +89,38 @@ class CalculatorTestCase(TestCase):
 class AgfsCalculatorTestCase(CalculatorTestCase):
     csv_path = NotImplemented
 
+    def assertAmountCorrect(self, amount, row, data):
+        self.assertEqual(amount, Decimal(row['CALC_FEE_EXC_VAT']), data)
+
     @classmethod
-    def create_tests(cls):
+    def get_tested_rows(cls):
         """
-        Insert test methods into the TestCase for each case in the spreadsheet
+        Rows of the spreadsheet for fees which have prices
         """
-        tested_scenarios = set()
-        tested_fees = set()
+        priced_fees = FeeType.objects.filter(
+            id__in=Price.objects.all().values_list('fee_type_id', flat=True).distinct()
+        ).values_list('code', flat=True).distinct()
         with open(cls.csv_path) as csvfile:
             reader = csv.DictReader(csvfile)
-            priced_fees = FeeType.objects.filter(
-                id__in=Price.objects.all().values_list('fee_type_id', flat=True).distinct()
-            ).values_list('code', flat=True).distinct()
             for i, row in enumerate(reader):
                 if row['BILL_SUB_TYPE'] in priced_fees:
-                    tested_scenarios.add(row['BILL_SCENARIO_ID'])
-                    tested_fees.add(row['BILL_SUB_TYPE'])
-                    setattr(
-                        cls,
-                        cls.get_test_name('agfs', row, i+2),
-                        cls.make_test(row, i+2)
-                    )
+                    yield i+2, row
+
+    @classmethod
+    def create_tests(cls):
+        """
+        Insert test methods into the TestCase for each case in the spreadsheet
+        """
+        tested_scenarios = set()
+        tested_fees = set()
+        for line_number, row in cls.get_tested_rows():
+            tested_scenarios.add(row['BILL_SCENARIO_ID'])
+            tested_fees.add(row['BILL_SUB_TYPE'])
+            setattr(
+                cls,
+                cls.get_test_name('agfs', row, line_number),
+                cls.make_test(row, line_number)
+            )
         print('{0}: Testing {1} scenarios and {2} fees'.format(
             cls.__name__, len(tested_scenarios), len(tested_fees)
         ))
@@ -92,10 +129,7 @@ class AgfsCalculatorTestCase(CalculatorTestCase):
 class LgfsCalculatorTestCase(CalculatorTestCase):
     csv_path = NotImplemented
 
-    def assertRowValuesCorrect(self, row):
-        """
-        Assert row values equal calculated values
-        """
+    def get_row_data(self, row):
         data = {
             'scheme': self.scheme_id,
             'fee_type_code': row['BILL_SUB_TYPE'],
@@ -110,12 +144,10 @@ class LgfsCalculatorTestCase(CalculatorTestCase):
         if row['NO_DEFENDANTS']:
             data['NUMBER_OF_DEFENDANTS'] = int(row['NO_DEFENDANTS'])
 
-        resp = self.client.get(self.endpoint(), data=data)
-        self.assertEqual(
-            resp.status_code, status.HTTP_200_OK, resp.content
-        )
+        return data
 
-        returned = resp.data['amount']
+    def assertAmountCorrect(self, amount, row, data):
+        returned = amount
         expected = Decimal(row['ACTUAL_FEE_EXC_VAT'] or row['CALC_FEE_EXC_VAT'])
         close_enough = math.isclose(returned, expected, abs_tol=0.011)
         if not close_enough:
@@ -130,21 +162,26 @@ class LgfsCalculatorTestCase(CalculatorTestCase):
             )
         )
 
+    @classmethod
+    def get_tested_rows(cls):
+        with open(cls.csv_path) as csvfile:
+            reader = csv.DictReader(csvfile)
+            for i, row in enumerate(reader):
+                yield i+2, row
+
     @classmethod
     def create_tests(cls):
         """
         Insert test methods into the TestCase for each case in the spreadsheet
         """
         tested_scenarios = set()
-        with open(cls.csv_path) as csvfile:
-            reader = csv.DictReader(csvfile)
-            for i, row in enumerate(reader):
-                tested_scenarios.add(row['SCENARIO'])
-                setattr(
-                    cls,
-                    cls.get_test_name('lgfs', row, i+2),
-                    cls.make_test(row, i+2)
-                )
+        for line_number, row in cls.get_tested_rows():
+            tested_scenarios.add(row['SCENARIO'])
+            setattr(
+                cls,
+                cls.get_test_name('lgfs', row, line_number),
+                cls.make_test(row, line_number)
+            )
         print('{0}: Testing {1} scenarios'.format(
             cls.__name__, len(tested_scenarios)
         ))
@@ -301,10 +338,7 @@ class LgfsWarrantFeeTestMixin(BaseWarrantFeeTestMixin):
 
 class Agfs10PlusCalculatorTestCase(AgfsCalculatorTestCase):
 
-    def assertRowValuesCorrect(self, row):
-        """
-        Assert row values equal calculated values
-        """
+    def get_row_data(self, row):
         is_basic = row['BILL_SUB_TYPE'] == 'AGFS_FEE'
 
         data = {
@@ -348,11 +382,4 @@ class Agfs10PlusCalculatorTestCase(AgfsCalculatorTestCase):
         if row['PPE']:
             data['PAGES_OF_PROSECUTING_EVIDENCE'] = int(row['PPE'])
 
-        resp = self.client.get(self.endpoint(), data=data)
-        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.content)
-
-        self.assertEqual(
-            resp.data['amount'],
-            Decimal(row['CALC_FEE_EXC_VAT']),
-            data
-        )
+        return data
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 import logging
 
+from django.test import override_settings
+
+from calculator.snapshot import clear_snapshots
+
 BASIC_FEES_MAP = {
     'FXACV': 'AGFS_APPEAL_CON',
     'FXASE': 'AGFS_APPEAL_SEN',
@@ -251,3 +255,19 @@ def prevent_request_warnings(original_function):
         logger.setLevel(previous_logging_level)
 
     return new_function
+
+
+class SnapshotTestMixin():
+    """
+    Start each test with empty data snapshots, and don't recheck the data
+    version during a test, so that snapshots are only rebuilt when a test
+    changes the data version or clears them itself.
+    """
+
+    def setUp(self):
+        super().setUp()
+        version_check = override_settings(DATA_VERSION_CHECK_INTERVAL=3600)
+        version_check.enable()
+        self.addCleanup(version_check.disable)
+        clear_snapshots()
+        self.addCleanup(clear_snapshots)
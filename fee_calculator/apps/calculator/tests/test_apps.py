@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from calculator.apps import set_sqlite_pragmas
+
+
+class SqlitePragmasTestCase(TestCase):
+
+    def get_cache_size(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_set_on_connection(self):
+        original_cache_size = self.get_cache_size()
+        self.addCleanup(
+            connection.connection.execute,
+            'PRAGMA cache_size = {}'.format(original_cache_size)
+        )
+
+        with override_settings(SQLITE_PRAGMAS={'cache_size': -1024}):
+            set_sqlite_pragmas(None, connection)
+        self.assertEqual(self.get_cache_size(), -1024)
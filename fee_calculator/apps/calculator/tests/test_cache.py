@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from calculator.cache import CalculationCache, get_calculation_key
+from calculator.models import (
+    Scheme, Scenario, FeeType, OffenceClass, AdvocateType, Unit, ModifierType
+)
+from calculator.snapshot import update_data_version
+from calculator.tests.lib.utils import SnapshotTestMixin
+
+
+@override_settings(
+    CALCULATION_CACHE_SIZE=2, CALCULATION_CACHE_TTL=60,
+    CALCULATION_CACHE_ALIAS=None
+)
+class CalculationCacheTestCase(SnapshotTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.cache = CalculationCache()
+        self.scheme = Scheme.objects.get(pk=1)
+        self.scenario = Scenario.objects.get(pk=2)
+        self.fee_type = FeeType.objects.get(code='AGFS_FEE')
+        self.offence_class = OffenceClass.objects.get(pk='A')
+        self.advocate_type = AdvocateType.objects.get(pk='JRALONE')
+        self.day = Unit.objects.get(pk='DAY')
+        self.ppe = Unit.objects.get(pk='PPE')
+        self.defendants = ModifierType.objects.get(name='NUMBER_OF_DEFENDANTS')
+        self.cases = ModifierType.objects.get(name='NUMBER_OF_CASES')
+
+        patcher = mock.patch(
+            'calculator.cache.calculate_total', return_value=Decimal('10.00')
+        )
+        self.calculate_total = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def calculate(self, days=1):
+        return self.cache.calculate_total(
+            self.scheme, self.scenario, self.fee_type, self.offence_class,
+            self.advocate_type, [(self.day, Decimal(days))], []
+        )
+
+    def test_key_ignores_count_order_and_exponent(self):
+        self.assertEqual(
+            get_calculation_key(
+                self.scheme, self.scenario, self.fee_type, self.offence_class,
+                self.advocate_type,
+                [(self.day, Decimal('2')), (self.ppe, Decimal('10'))],
+                [(self.defendants, Decimal('3')), (self.cases, Decimal('2.0'))]
+            ),
+            get_calculation_key(
+                self.scheme, self.scenario, self.fee_type, self.offence_class,
+                self.advocate_type,
+                [(self.ppe, Decimal('10.00')), (self.day, Decimal('2.0'))],
+                [(self.cases, Decimal('2')), (self.defendants, Decimal('3'))]
+            )
+        )
+
+    def test_key_differs_by_count(self):
+        self.assertNotEqual(
+            get_calculation_key(
+                self.scheme, self.scenario, self.fee_type, self.offence_class,
+                self.advocate_type, [(self.day, Decimal('2'))], []
+            ),
+            get_calculation_key(
+                self.scheme, self.scenario, self.fee_type, self.offence_class,
+                self.advocate_type, [(self.day, Decimal('3'))], []
+            )
+        )
+
+    def test_repeated_calculation_is_cached(self):
+        self.assertEqual(self.calculate(), Decimal('10.00'))
+        self.assertEqual(self.calculate(), Decimal('10.00'))
+
+        self.assertEqual(self.calculate_total.call_count, 1)
+        self.assertEqual(self.cache.stats(), {
+            'size': 1, 'hits': 1, 'shared_hits': 0, 'misses': 1,
+        })
+
+    def test_least_recently_used_evicted(self):
+        self.calculate(1)
+        self.calculate(2)
+        self.calculate(1)
+        self.calculate(3)
+
+        self.calculate(1)
+        self.assertEqual(self.calculate_total.call_count, 3)
+        self.calculate(2)
+        self.assertEqual(self.calculate_total.call_count, 4)
+
+    def test_expired_results_recalculated(self):
+        with mock.patch('calculator.cache.time.monotonic', return_value=100):
+            self.calculate()
+        with mock.patch('calculator.cache.time.monotonic', return_value=159):
+            self.calculate()
+        self.assertEqual(self.calculate_total.call_count, 1)
+
+        with mock.patch('calculator.cache.time.monotonic', return_value=160):
+            self.calculate()
+        self.assertEqual(self.calculate_total.call_count, 2)
+
+    def test_flushed_when_data_version_changes(self):
+        self.calculate()
+        update_data_version()
+        self.calculate()
+
+        self.assertEqual(self.calculate_total.call_count, 2)
+
+    @override_settings(CALCULATION_CACHE_SIZE=0)
+    def test_disabled_when_size_is_zero(self):
+        self.calculate()
+        self.calculate()
+
+        self.assertEqual(self.calculate_total.call_count, 2)
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'calculations': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'calculations',
+            },
+        },
+        CALCULATION_CACHE_ALIAS='calculations'
+    )
+    def test_results_shared_between_caches(self):
+        self.calculate()
+        other_cache = CalculationCache()
+        other_cache.calculate_total(
+            self.scheme, self.scenario, self.fee_type, self.offence_class,
+            self.advocate_type, [(self.day, Decimal(1))], []
+        )
+
+        self.assertEqual(self.calculate_total.call_count, 1)
+        self.assertEqual(other_cache.stats()['shared_hits'], 1)
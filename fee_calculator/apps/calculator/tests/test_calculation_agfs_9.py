@@ -17,10 +17,7 @@ class Agfs9CalculatorTestCase(AgfsCalculatorTestCase):
         'data/test_dataset_agfs_9.csv'
     )
 
-    def assertRowValuesCorrect(self, row):
-        """
-        Assert row values equal calculated values
-        """
+    def get_row_data(self, row):
         is_basic = row['BILL_SUB_TYPE'] == 'AGFS_FEE'
 
         data = {
@@ -66,14 +63,7 @@ class Agfs9CalculatorTestCase(AgfsCalculatorTestCase):
         if row['THIRD_CRACKED']:
             data['THIRD_CRACKED'] = int(row['THIRD_CRACKED'])
 
-        resp = self.client.get(self.endpoint(), data=data)
-        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.content)
-
-        self.assertEqual(
-            resp.data['amount'],
-            Decimal(row['CALC_FEE_EXC_VAT']),
-            data
-        )
+        return data
 
 
 Agfs9CalculatorTestCase.create_tests()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Q
+from django.test import TestCase
+
+from calculator.models import (
+    AdvocateType, FeeType, Price, Scenario, Scheme, Unit
+)
+from calculator.snapshot import get_data_version
+from calculator.tests.test_models import create_test_price
+
+
+def get_copied_values(prices, exclude=()):
+    fields = [
+        'scenario', 'fee_type', 'unit', 'advocate_type', 'offence_class',
+        'fixed_fee', 'fee_per_unit', 'limit_from', 'limit_to', 'strict_range'
+    ]
+    return sorted(
+        tuple(
+            str(price.serializable_value(name))
+            for name in fields if name not in exclude
+        ) + tuple(sorted(modifier.pk for modifier in price.modifiers.all()))
+        for price in prices.prefetch_related('modifiers')
+    )
+
+
+class CopySchemeTestCase(TestCase):
+
+    def setUp(self):
+        self.source_scheme = Scheme.objects.get(pk=1)
+        self.new_scheme = Scheme.objects.create(
+            start_date=date(2030, 1, 1), base_type=1, description='Copy'
+        )
+
+    def copy_scheme(self, *args):
+        call_command(
+            'copyscheme', self.source_scheme.pk, self.new_scheme.pk, *args,
+            stdout=StringIO()
+        )
+
+    def test_copies_prices_with_modifiers(self):
+        version = get_data_version().version
+        self.copy_scheme('--chunk-size', '7')
+        self.assertEqual(
+            get_copied_values(self.new_scheme.prices.all()),
+            get_copied_values(self.source_scheme.prices.all())
+        )
+        self.assertNotEqual(get_data_version().version, version)
+
+    def test_ids_of_deleted_prices_not_reused(self):
+        deleted = create_test_price(scheme=self.source_scheme)
+        deleted_pk = deleted.pk
+        deleted.delete()
+        self.copy_scheme('--chunk-size', '7')
+        self.assertGreater(
+            self.new_scheme.prices.order_by('pk').first().pk, deleted_pk
+        )
+        self.assertEqual(
+            get_copied_values(self.new_scheme.prices.all()),
+            get_copied_values(self.source_scheme.prices.all())
+        )
+
+    def test_copies_selected_prices(self):
+        price = self.source_scheme.prices.filter(
+            offence_class__isnull=False
+        ).first()
+        self.copy_scheme(
+            '--fee-type', str(price.fee_type_id),
+            '--scenario', str(price.scenario_id),
+            '--offence-class', price.offence_class_id
+        )
+        self.assertEqual(
+            get_copied_values(self.new_scheme.prices.all()),
+            get_copied_values(self.source_scheme.prices.filter(
+                Q(offence_class__isnull=True) |
+                Q(offence_class=price.offence_class),
+                fee_type=price.fee_type, scenario=price.scenario
+            ))
+        )
+
+    def test_applies_uplift(self):
+        self.copy_scheme('--uplift', '2.5')
+        source_prices = self.source_scheme.prices.order_by('pk')
+        new_prices = self.new_scheme.prices.order_by('pk')
+        self.assertEqual(source_prices.count(), new_prices.count())
+        for source_price, new_price in zip(source_prices, new_prices):
+            self.assertEqual(
+                new_price.fixed_fee,
+                (source_price.fixed_fee * Decimal('1.025')).quantize(
+                    Decimal('0.00001'), rounding=ROUND_HALF_UP
+                )
+            )
+            self.assertEqual(
+                new_price.fee_per_unit,
+                (source_price.fee_per_unit * Decimal('1.025')).quantize(
+                    Decimal('0.00001'), rounding=ROUND_HALF_UP
+                )
+            )
+        self.assertFalse(Price.objects.filter(
+            scheme=self.source_scheme, pk__in=new_prices
+        ).exists())
+
+
+class CopyFeeTypeTestCase(TestCase):
+
+    def setUp(self):
+        self.scheme = Scheme.objects.get(pk=1)
+        self.source_fee_type = FeeType.objects.get(code='AGFS_ADJOURNED')
+        self.new_fee_type = FeeType.objects.create(
+            name='Copy', code='AGFS_COPY', is_basic=False, aggregation='sum'
+        )
+
+    def copy_fee_type(self, *args):
+        stdout = StringIO()
+        call_command(
+            'copyfeetype', self.source_fee_type.pk, self.scheme.pk,
+            self.new_fee_type.pk, self.scheme.pk, *args, stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_copies_prices_with_unit(self):
+        unit = Unit.objects.get(pk='DAY')
+        self.copy_fee_type('--unit', unit.pk, '--chunk-size', '3')
+        source_prices = self.scheme.prices.filter(
+            fee_type=self.source_fee_type
+        )
+        new_prices = self.scheme.prices.filter(fee_type=self.new_fee_type)
+        self.assertEqual(new_prices.count(), source_prices.count())
+        self.assertFalse(new_prices.exclude(unit=unit).exists())
+        self.assertEqual(
+            get_copied_values(new_prices, exclude=['fee_type', 'unit']),
+            get_copied_values(source_prices, exclude=['fee_type', 'unit'])
+        )
+
+    def test_dry_run(self):
+        version = get_data_version().version
+        output = self.copy_fee_type('--dry-run')
+        self.assertFalse(self.new_fee_type.prices.exists())
+        self.assertEqual(get_data_version().version, version)
+        self.assertIn('Would create {} prices'.format(
+            self.scheme.prices.filter(fee_type=self.source_fee_type).count()
+        ), output)
+
+
+class DerivePricesFromTestCase(TestCase):
+
+    def setUp(self):
+        self.scheme = Scheme.objects.get(pk=1)
+        self.fee_type = FeeType.objects.create(
+            name='Derived', code='AGFS_DERIVED', is_basic=False,
+            aggregation='sum'
+        )
+        self.source_scenario, self.target_scenario = Scenario.objects.order_by(
+            'pk'
+        )[:2]
+
+    def create_price(self, scenario, advocate_type, fixed_fee, fee_per_unit):
+        return create_test_price(
+            scheme=self.scheme, scenario=scenario, fee_type=self.fee_type,
+            advocate_type=advocate_type, fixed_fee=Decimal(fixed_fee),
+            fee_per_unit=Decimal(fee_per_unit)
+        )
+
+    def derive_prices(self, *args):
+        stdout = StringIO()
+        call_command(
+            'derivepricesfrom', self.scheme.pk, self.target_scenario.pk,
+            self.fee_type.pk, '--source-scenario', self.source_scenario.pk,
+            *args, stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_derives_fees_from_equivalent_prices(self):
+        junior, qc = AdvocateType.objects.get(pk='JUNIOR'), AdvocateType.objects.get(pk='QC')
+        self.create_price(self.source_scenario, junior, '100.00', '10.00')
+        self.create_price(self.source_scenario, qc, '200.00', '20.00')
+        junior_target = self.create_price(self.target_scenario, junior, '1.00', '1.00')
+        qc_target = self.create_price(self.target_scenario, qc, '180.00', '18.00')
+        unmatched_target = self.create_price(
+            self.target_scenario, AdvocateType.objects.get(pk='LEDJR'), '1.00', '1.00'
+        )
+        version = get_data_version().version
+
+        output = self.derive_prices('--percentage', '90')
+
+        self.assertIn('Changed 1 of 3 prices', output)
+        junior_target.refresh_from_db()
+        self.assertEqual(junior_target.fixed_fee, Decimal('90.00'))
+        self.assertEqual(junior_target.fee_per_unit, Decimal('9.00'))
+        qc_target.refresh_from_db()
+        self.assertEqual(qc_target.fixed_fee, Decimal('180.00'))
+        unmatched_target.refresh_from_db()
+        self.assertEqual(unmatched_target.fixed_fee, Decimal('1.00'))
+        self.assertNotEqual(get_data_version().version, version)
+
+    def test_dry_run(self):
+        junior = AdvocateType.objects.get(pk='JUNIOR')
+        self.create_price(self.source_scenario, junior, '100.00', '10.00')
+        target = self.create_price(self.target_scenario, junior, '1.00', '1.00')
+
+        output = self.derive_prices('--field', 'fixed_fee', '--dry-run')
+
+        self.assertIn('Would change 1 of 1 prices', output)
+        target.refresh_from_db()
+        self.assertEqual(target.fixed_fee, Decimal('1.00'))
+
+    def test_ambiguous_sources(self):
+        junior = AdvocateType.objects.get(pk='JUNIOR')
+        self.create_price(self.source_scenario, junior, '100.00', '10.00')
+        self.create_price(self.source_scenario, junior, '0.00', '10.00')
+        with self.assertRaises(CommandError):
+            self.derive_prices()
+        self.assertIn(
+            'Changed 0 of 0 prices',
+            self.derive_prices('--field', 'fixed_fee', '--exclude-zero')
+        )
+
+    def test_require_source(self):
+        junior = AdvocateType.objects.get(pk='JUNIOR')
+        self.create_price(self.source_scenario, junior, '100.00', '10.00')
+        target = self.create_price(self.target_scenario, junior, '1.00', '1.00')
+        self.create_price(
+            self.target_scenario, AdvocateType.objects.get(pk='LEDJR'), '1.00', '1.00'
+        )
+        with self.assertRaises(CommandError):
+            self.derive_prices('--require-source')
+        target.refresh_from_db()
+        self.assertEqual(target.fixed_fee, Decimal('1.00'))
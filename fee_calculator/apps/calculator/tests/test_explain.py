@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import time
+
+from django.test import TestCase
+
+from calculator.constants import AGGREGATION_TYPE
+from calculator.explain import StageTimer, explain_total
+from calculator.models import Price, calculate_total
+from calculator.tests.lib.utils import SnapshotTestMixin
+
+
+class StageTimerTestCase(TestCase):
+
+    def test_nested_stages_excluded(self):
+        timer = StageTimer()
+        with timer.stage('outer'):
+            with timer.stage('inner'):
+                time.sleep(0.02)
+        self.assertEqual(list(timer.timings), ['outer', 'inner'])
+        self.assertGreaterEqual(timer.timings['inner'], 20)
+        self.assertLess(timer.timings['outer'], 20)
+
+
+class ExplainTotalTestCase(SnapshotTestMixin, TestCase):
+
+    def test_amount_matches_calculate_total(self):
+        prices = list(Price.objects.filter(
+            fee_type__aggregation=AGGREGATION_TYPE.SUM
+        ).select_related('fee_type', 'unit').order_by('pk')[:50]) + list(
+            Price.objects.filter(
+                fee_type__aggregation=AGGREGATION_TYPE.MAX
+            ).select_related('fee_type', 'unit').order_by('pk')[:50]
+        )
+        self.assertTrue(prices)
+        for price in prices:
+            calculation = (
+                price.scheme, price.scenario, price.fee_type,
+                price.offence_class, price.advocate_type,
+                [(price.unit, max(price.limit_from, 1) + 1)], []
+            )
+            explanation = explain_total(*calculation)
+            self.assertEqual(explanation['amount'], calculate_total(*calculation))
+            self.assertEqual(
+                explanation['aggregation'],
+                'MAX' if price.fee_type.aggregation == AGGREGATION_TYPE.MAX else 'SUM'
+            )
+            self.assertIn(price.pk, [
+                matched_price['price'] for matched_price in explanation['prices']
+            ])
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase
+
+from calculator.healthchecks import database_healthcheck
+
+
+class DatabaseHealthcheckTestCase(TestCase):
+
+    def test_reuses_open_connection(self):
+        connection.ensure_connection()
+        open_connection = connection.connection
+
+        response = database_healthcheck()
+        self.assertTrue(response.status)
+        self.assertEqual(response.get_dict()['reused_connection'], True)
+        self.assertIs(connection.connection, open_connection)
+
+    def test_closes_connection_on_failure(self):
+        with mock.patch.object(
+            connection, 'cursor', side_effect=DatabaseError
+        ), mock.patch.object(connection, 'close') as close:
+            with self.assertRaises(DatabaseError):
+                database_healthcheck()
+        close.assert_called_once_with()
@@ -6,7 +6,7 @@ from django.test import TestCase
 
 from calculator.models import (
     Scheme, Scenario, OffenceClass, FeeType, AdvocateType, Price, Unit,
-    ModifierType, Modifier
+    ModifierType, Modifier, ModifierTable, get_count
 )
 
 
@@ -155,6 +155,38 @@ class PriceTestCase(TestCase):
             [(case_modifiers[1], 1)]
         )
 
+    def test_get_modifiers_ordered_by_priority(self):
+        case_modifier_type, case_modifiers = create_test_modifiers(
+            unit=Unit.objects.get(id='CASE'), modifiers=[
+                dict(limit_from=2, limit_to=None, percent_per_unit=Decimal('15.00'),
+                     fixed_percent=Decimal('0.00'), priority=1)
+            ]
+        )
+        defendant_modifier_type, defendant_modifiers = create_test_modifiers(
+            unit=Unit.objects.get(id='DEFENDANT'), modifiers=[
+                dict(limit_from=2, limit_to=None, percent_per_unit=Decimal('25.00'),
+                     fixed_percent=Decimal('0.00'), priority=0),
+                dict(limit_from=1, limit_to=None, percent_per_unit=Decimal('0.00'),
+                     fixed_percent=Decimal('5.00'), priority=1)
+            ]
+        )
+        test_price = create_test_price(
+            modifiers=case_modifiers + defendant_modifiers
+        )
+        test_price.modifier_table = ModifierTable(test_price.modifiers.all())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                test_price.get_applicable_modifiers(
+                    Decimal('10.00'),
+                    [(defendant_modifier_type, 3,), (case_modifier_type, 2,)]
+                ),
+                [
+                    (defendant_modifiers[0], 3), (case_modifiers[0], 2),
+                    (defendant_modifiers[1], 3)
+                ]
+            )
+
     def test_calculate_total_1(self):
         day_unit = Unit.objects.get(id='DAY')
         case_unit = Unit.objects.get(id='CASE')
@@ -428,3 +460,34 @@ class PriceTestCase(TestCase):
             test_price_2.calculate_total(11, []),
             Decimal('11.00')
         )
+
+    def test_calculate_total_same_for_whole_number_counts(self):
+        day_unit = Unit.objects.get(id='DAY')
+        case_modifier_type, case_modifiers = create_test_modifiers(
+            unit=Unit.objects.get(id='CASE'), modifiers=[
+                dict(limit_from=2, limit_to=None, percent_per_unit=Decimal('12.35'),
+                     fixed_percent=Decimal('3.33'))
+            ]
+        )
+        test_price = create_test_price(
+            unit=day_unit,
+            fixed_fee=Decimal('7.12345'),
+            fee_per_unit=Decimal('33.33333'),
+            modifiers=case_modifiers,
+            limit_from=2,
+            limit_to=30
+        )
+
+        for count in ('1', '2', '7', '7.0', '30', '45'):
+            self.assertEqual(get_count(Decimal(count)), int(Decimal(count)))
+            self.assertEqual(
+                test_price.calculate_total(
+                    get_count(Decimal(count)),
+                    [(case_modifier_type, get_count(Decimal(count)),)]
+                ),
+                test_price.calculate_total(
+                    Decimal(count), [(case_modifier_type, Decimal(count),)]
+                )
+            )
+        self.assertEqual(get_count(Decimal('2.5')), Decimal('2.5'))
+        self.assertEqual(get_count(Decimal('Infinity')), Decimal('Infinity'))
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Q
+from django.test import TestCase
+
+from calculator.models import (
+    Scheme, Scenario, FeeType, OffenceClass, AdvocateType, Price, Unit,
+    ModifierType, calculate_total
+)
+from calculator.snapshot import (
+    DataVersionTracker, clear_snapshots, get_price_table, get_units,
+    get_modifier_types, get_fee_type_index, get_scheme_membership,
+    get_scheme_date_index
+)
+from calculator.tests.lib.utils import SnapshotTestMixin
+from calculator.tests.test_models import create_test_price
+
+
+class PriceTableTestCase(SnapshotTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.scheme = Scheme.objects.get(pk=1)
+        self.scenario = Scenario.objects.get(pk=1)
+        self.fee_type = FeeType.objects.get(code='AGFS_ADJOURNED')
+        self.offence_class = OffenceClass.objects.get(pk='A')
+        self.advocate_type = AdvocateType.objects.get(pk='JRALONE')
+        self.unit = Unit.objects.get(pk='HALFDAY')
+        Price.objects.filter(
+            scheme=self.scheme, scenario=self.scenario, fee_type=self.fee_type,
+            unit=self.unit
+        ).delete()
+
+    def create_price(self, **kwargs):
+        kwargs.setdefault('offence_class', self.offence_class)
+        kwargs.setdefault('advocate_type', self.advocate_type)
+        return create_test_price(
+            scheme=self.scheme, scenario=self.scenario, fee_type=self.fee_type,
+            unit=self.unit, limit_from=1, **kwargs
+        )
+
+    def calculate(self, unit_count, offence_class=None, advocate_type=None):
+        return calculate_total(
+            self.scheme, self.scenario, self.fee_type,
+            offence_class or self.offence_class,
+            advocate_type or self.advocate_type,
+            [(self.unit, unit_count)], []
+        )
+
+    def test_get_prices_matches_null_advocate_type_and_offence_class(self):
+        matching_price = self.create_price()
+        wildcard_price = self.create_price()
+        Price.objects.filter(pk=wildcard_price.pk).update(
+            advocate_type=None, offence_class=None
+        )
+        self.create_price(offence_class=OffenceClass.objects.get(pk='B'))
+        self.create_price(advocate_type=AdvocateType.objects.get(pk='QC'))
+
+        prices = get_price_table().get_prices(
+            self.scheme, self.scenario, self.fee_type, self.unit,
+            advocate_type=self.advocate_type, offence_class=self.offence_class
+        )
+
+        self.assertEqual(
+            [price.pk for price in prices],
+            [matching_price.pk, wildcard_price.pk]
+        )
+
+    def test_calculate_total_does_not_query_once_loaded(self):
+        self.create_price(fee_per_unit=Decimal('12.50'))
+        get_price_table()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.calculate(4), Decimal('50.00'))
+
+    def test_calculate_total_uses_snapshot_until_cleared(self):
+        self.create_price(fee_per_unit=Decimal('12.50'))
+        self.assertEqual(self.calculate(4), Decimal('50.00'))
+
+        self.create_price(fixed_fee=Decimal('10.00'), fee_per_unit=Decimal('0.00'))
+        self.assertEqual(self.calculate(4), Decimal('50.00'))
+
+        clear_snapshots()
+        self.assertEqual(self.calculate(4), Decimal('60.00'))
+
+
+class ReferenceDataRegistryTestCase(SnapshotTestMixin, TestCase):
+
+    def test_units_keyed_by_upper_case_id(self):
+        units = get_units()
+        self.assertEqual(
+            sorted(units.keys()),
+            sorted(Unit.objects.values_list('pk', flat=True))
+        )
+        self.assertEqual(units['DAY'], Unit.objects.get(pk='DAY'))
+
+    def test_modifier_types_keyed_by_upper_case_name(self):
+        modifier_types = get_modifier_types()
+        self.assertEqual(
+            sorted(modifier_types.keys()),
+            sorted(ModifierType.objects.values_list('name', flat=True))
+        )
+        self.assertEqual(
+            modifier_types['TRIAL_LENGTH'],
+            ModifierType.objects.get(name='TRIAL_LENGTH')
+        )
+
+    def test_registry_does_not_query_once_loaded(self):
+        get_units()
+        get_modifier_types()
+
+        with self.assertNumQueries(0):
+            get_units()
+            get_modifier_types()
+
+    def test_registry_reloaded_when_cleared(self):
+        get_modifier_types()
+        ModifierType.objects.create(
+            name='new_modifier', description='New modifier',
+            unit=Unit.objects.get(pk='DAY')
+        )
+        self.assertNotIn('NEW_MODIFIER', get_modifier_types())
+
+        clear_snapshots()
+        self.assertIn('NEW_MODIFIER', get_modifier_types())
+
+
+class DataVersionTrackerTestCase(SnapshotTestMixin, TestCase):
+
+    def test_first_check_clears_snapshots(self):
+        get_modifier_types()
+        ModifierType.objects.create(
+            name='new_modifier', description='New modifier',
+            unit=Unit.objects.get(pk='DAY')
+        )
+
+        DataVersionTracker().get()
+        self.assertIn('NEW_MODIFIER', get_modifier_types())
+
+    def test_unchanged_version_keeps_snapshots(self):
+        tracker = DataVersionTracker()
+        tracker.get()
+        get_modifier_types()
+        ModifierType.objects.create(
+            name='new_modifier', description='New modifier',
+            unit=Unit.objects.get(pk='DAY')
+        )
+
+        tracker.reset()
+        tracker.get()
+        self.assertNotIn('NEW_MODIFIER', get_modifier_types())
+
+
+class FeeTypeIndexTestCase(SnapshotTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.scheme = Scheme.objects.get(pk=2)
+        self.fee_types = list(FeeType.objects.filter(code='AGFS_PLEA').order_by('pk'))
+        Price.objects.filter(
+            scheme=self.scheme, fee_type__in=self.fee_types
+        ).delete()
+
+    def test_get_fee_types_by_code(self):
+        self.assertEqual(
+            get_fee_type_index().get_fee_types('AGFS_PLEA'), self.fee_types
+        )
+        self.assertEqual(get_fee_type_index().get_fee_types('AGFS_BURP'), [])
+
+    def test_get_fee_types_priced_in_scheme(self):
+        self.assertEqual(
+            get_fee_type_index().get_fee_types('AGFS_PLEA', scheme=self.scheme),
+            []
+        )
+
+        create_test_price(scheme=self.scheme, fee_type=self.fee_types[0])
+        clear_snapshots()
+        self.assertEqual(
+            get_fee_type_index().get_fee_types('AGFS_PLEA', scheme=self.scheme),
+            self.fee_types[:1]
+        )
+
+        create_test_price(scheme=self.scheme, fee_type=self.fee_types[1])
+        clear_snapshots()
+        self.assertEqual(
+            get_fee_type_index().get_fee_types('AGFS_PLEA', scheme=self.scheme),
+            self.fee_types
+        )
+
+    def test_index_does_not_query_once_loaded(self):
+        get_fee_type_index()
+
+        with self.assertNumQueries(0):
+            get_fee_type_index().get_fee_types('AGFS_FEE', scheme=self.scheme)
+
+
+class SchemeMembershipTestCase(SnapshotTestMixin, TestCase):
+
+    def test_ids_match_prices_of_scheme(self):
+        relations = (
+            (Scenario, 'prices__scheme'),
+            (FeeType, 'prices__scheme'),
+            (AdvocateType, 'prices__scheme'),
+            (OffenceClass, 'prices__scheme'),
+            (Unit, 'prices__scheme'),
+            (ModifierType, 'values__prices__scheme'),
+        )
+        for scheme in Scheme.objects.all():
+            for model, relation in relations:
+                self.assertEqual(
+                    get_scheme_membership().get_ids(scheme, model),
+                    list(model.objects.filter(
+                        **{relation: scheme}
+                    ).order_by('pk').distinct().values_list('pk', flat=True))
+                )
+
+    def test_ids_match_prices_of_query(self):
+        scheme = Scheme.objects.get(pk=1)
+        scenario = Scenario.objects.get(pk=2)
+        advocate_type = AdvocateType.objects.get(pk='JRALONE')
+        offence_class = OffenceClass.objects.get(pk='A')
+        fee_types = list(FeeType.objects.filter(code='AGFS_FEE'))
+        prices = Price.objects.filter(
+            Q(advocate_type=advocate_type) | Q(advocate_type__isnull=True),
+            Q(offence_class=offence_class) | Q(offence_class__isnull=True),
+            scheme=scheme, scenario=scenario, fee_type__in=fee_types
+        )
+        for model, relation in (
+            (FeeType, 'fee_type'),
+            (Unit, 'unit'),
+            (ModifierType, 'modifiers__modifier_type'),
+        ):
+            self.assertEqual(
+                get_scheme_membership().get_ids(
+                    scheme, model, scenario=scenario,
+                    advocate_type=advocate_type, offence_class=offence_class,
+                    fee_types=fee_types
+                ),
+                sorted(set(
+                    prices.filter(**{'{}__isnull'.format(relation): False})
+                    .values_list(relation, flat=True)
+                ))
+            )
+
+    def test_no_ids_for_scheme_without_prices(self):
+        scheme = Scheme.objects.get(pk=1)
+        Price.objects.filter(scheme=scheme).delete()
+        self.assertEqual(get_scheme_membership().get_ids(scheme, FeeType), [])
+
+    def test_membership_does_not_query_once_loaded(self):
+        get_scheme_membership()
+
+        with self.assertNumQueries(0):
+            get_scheme_membership().get_ids(Scheme(pk=1), Scenario)
+
+
+class SchemeDateIndexTestCase(SnapshotTestMixin, TestCase):
+
+    def test_schemes_match_query(self):
+        Scheme.objects.create(
+            start_date=date(2018, 6, 1), end_date=date(2018, 6, 30),
+            base_type=1, description='Overlapping scheme'
+        )
+        case_date = date(2012, 1, 1)
+        while case_date < date(2022, 1, 1):
+            for base_type in (None, 1, 2):
+                schemes = Scheme.objects.filter(
+                    Q(end_date__isnull=True) | Q(end_date__gte=case_date),
+                    start_date__lte=case_date
+                ).order_by('pk')
+                if base_type is not None:
+                    schemes = schemes.filter(base_type=base_type)
+                self.assertEqual(
+                    get_scheme_date_index().get_schemes(case_date, base_type),
+                    list(schemes)
+                )
+            case_date += timedelta(days=15)
+
+    def test_index_does_not_query_once_loaded(self):
+        get_scheme_date_index()
+
+        with self.assertNumQueries(0):
+            get_scheme_date_index().get_schemes(date(2019, 1, 1), 1)
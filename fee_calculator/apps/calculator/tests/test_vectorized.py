@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+import random
+from unittest import mock, skipIf
+
+from django.test import TestCase
+
+from api.views import CalculatorLookups, get_calculation_from_params
+from calculator.models import (
+    Scheme, OffenceClass, AdvocateType, Price, ModifierType, Modifier,
+    calculate_total
+)
+from calculator.snapshot import (
+    clear_snapshots, get_units, get_modifier_types
+)
+from calculator.tests import (
+    test_calculation_agfs_9, test_calculation_agfs_10,
+    test_calculation_agfs_11, test_calculation_agfs_12,
+    test_calculation_lgfs_2016
+)
+from calculator.tests.lib.utils import SnapshotTestMixin
+from calculator.tests.test_models import create_test_price
+from calculator.vectorized import calculate_totals, np, to_count
+
+
+DATASET_TEST_CASES = (
+    test_calculation_agfs_9.Agfs9CalculatorTestCase,
+    test_calculation_lgfs_2016.Lgfs2016CalculatorTestCase,
+    test_calculation_agfs_10.Agfs10CalculatorTestCase,
+    test_calculation_agfs_11.Agfs11CalculatorTestCase,
+    test_calculation_agfs_12.Agfs12CalculatorTestCase,
+)
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class VectorizedCalculationTestCase(SnapshotTestMixin, TestCase):
+
+    def assertTotalsMatch(self, calculations):
+        self.assertGreater(len(calculations), 0)
+        expected = [
+            calculate_total(*calculation) for calculation in calculations
+        ]
+        for calculation, total, expected_total in zip(
+            calculations, calculate_totals(calculations), expected
+        ):
+            self.assertEqual(total, expected_total, calculation)
+
+    def test_totals_match_for_all_prices(self):
+        generator = random.Random(0)
+        units = list(get_units().values())
+        modifier_types = list(get_modifier_types().values())
+        offence_classes = list(OffenceClass.objects.all())
+        advocate_types = list(AdvocateType.objects.all())
+
+        calculations = []
+        for price in Price.objects.select_related(
+            'scheme', 'scenario', 'fee_type', 'offence_class', 'advocate_type',
+            'unit'
+        ):
+            for _ in range(3):
+                unit_counts = [(
+                    price.unit,
+                    Decimal(generator.choice([0, 1, 2, 3, 5, 12, 40, 100, 1000]))
+                )]
+                if generator.random() < 0.3:
+                    unit_counts.append(
+                        (generator.choice(units), Decimal(generator.randint(1, 250)))
+                    )
+                calculations.append((
+                    price.scheme, price.scenario, price.fee_type,
+                    price.offence_class or generator.choice(offence_classes),
+                    price.advocate_type or generator.choice(advocate_types),
+                    unit_counts,
+                    [
+                        (modifier_type, Decimal(generator.randint(0, 40)))
+                        for modifier_type in generator.sample(
+                            modifier_types, generator.randint(0, 4)
+                        )
+                    ]
+                ))
+        self.assertTotalsMatch(calculations)
+
+    def test_totals_match_csv_datasets(self):
+        lookups = CalculatorLookups()
+        for case_class in DATASET_TEST_CASES:
+            # the rows are made into calculations as the calculator tests
+            # for each dataset make them into requests
+            case = case_class()
+            case.client = self.client
+            scheme = Scheme.objects.get(pk=case.scheme_id)
+            rows = list(case_class.get_tested_rows())
+            self.assertGreater(len(rows), 0)
+            data = [case.get_row_data(row) for _, row in rows]
+            totals = calculate_totals([
+                get_calculation_from_params(scheme, row_data, lookups)
+                for row_data in data
+            ])
+            for (line_number, row), row_data, total in zip(rows, data, totals):
+                with self.subTest(csv_path=case.csv_path, line_number=line_number):
+                    case.assertAmountCorrect(
+                        total.quantize(Decimal('0.01')), row, row_data
+                    )
+
+    def test_fractional_counts_match(self):
+        price = Price.objects.filter(modifiers__isnull=False).first()
+        modifier = price.modifiers.all()[0]
+        self.assertTotalsMatch([(
+            price.scheme, price.scenario, price.fee_type, price.offence_class,
+            price.advocate_type, [(price.unit, Decimal(count))],
+            [(modifier.modifier_type, Decimal(modifier_count))]
+        ) for count in ('2.5', '3') for modifier_count in ('1.5', '7')])
+
+    def test_counts_that_are_not_finite_not_vectorized(self):
+        for value in ('Infinity', '-Infinity', 'NaN', 'sNaN'):
+            self.assertIsNone(to_count(Decimal(value)), value)
+        for value in ('inf', 'nan'):
+            self.assertIsNone(to_count(float(value)), value)
+        self.assertEqual(to_count(Decimal('3')), 3)
+
+    def test_inexact_percentages_match(self):
+        scheme = Scheme.objects.get(pk=1)
+        modifier_type = ModifierType.objects.first()
+        modifiers = [
+            Modifier.objects.create(
+                limit_from=1, fixed_percent=Decimal('12.35'),
+                percent_per_unit=Decimal('0.01'), modifier_type=modifier_type,
+                priority=priority
+            )
+            for priority in (0, 1)
+        ]
+        price = create_test_price(
+            scheme=scheme, fixed_fee=Decimal('0.00001'),
+            fee_per_unit=Decimal('33.33333'), limit_from=1, modifiers=modifiers
+        )
+        clear_snapshots()
+
+        self.assertTotalsMatch([(
+            scheme, price.scenario, price.fee_type, price.offence_class,
+            price.advocate_type, [(price.unit, Decimal(count))],
+            [(modifier_type, Decimal(count))]
+        ) for count in range(1, 10)])
+
+    def test_calculations_without_numpy(self):
+        price = Price.objects.first()
+        calculation = (
+            price.scheme, price.scenario, price.fee_type, price.offence_class,
+            price.advocate_type, [(price.unit, Decimal(3))], []
+        )
+        with mock.patch('calculator.vectorized.np', None):
+            self.assertEqual(
+                calculate_totals([calculation]),
+                [calculate_total(*calculation)]
+            )
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+'''
+Calculation of many totals at once with NumPy, giving the same results as
+`calculate_total`.
+
+Amounts are held as integers of pence x 10^5 and percentages as integers of
+hundredths of a percent, so all arithmetic is exact. Any calculation which
+can't be evaluated exactly in 64 bit integers, e.g. one with fractional
+counts or with a modifier leaving a remainder, is made with
+`calculate_total` instead.
+
+NumPy is optional: without it every calculation is made with
+`calculate_total`.
+'''
+from decimal import Decimal
+
+from .constants import AGGREGATION_TYPE
+from .models import calculate_total
+from .snapshot import get_pk, get_price_table, snapshot
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SCALE = 10 ** 7
+PERCENT_SCALE = 100
+PERCENT_DIVISOR = 100 * PERCENT_SCALE
+MAX_COUNT = 2 ** 31
+LIMIT = 2.0 ** 62
+
+
+def to_fixed(value, scale):
+    '''
+    Get `value` multiplied by `scale` as an int, or None if that isn't
+    a whole number
+    '''
+    if value is None:
+        return 0
+    scaled = Decimal(value) * scale
+    if scaled != scaled.to_integral_value():
+        return None
+    return int(scaled)
+
+
+def to_count(value):
+    '''
+    Get a unit or modifier count as an int, or None if it isn't a finite
+    whole number within range
+    '''
+    if isinstance(value, Decimal) and (
+        not value.is_finite() or value != value.to_integral_value()
+    ):
+        return None
+    if isinstance(value, float) and not value.is_integer():
+        return None
+    count = int(value)
+    if abs(count) >= MAX_COUNT:
+        return None
+    return count
+
+
+def get_value_covered_by_range(value, limit_from, limit_to):
+    '''
+    Vectorized `calculator.models.get_value_covered_by_range`, where
+    a `limit_to` of 0 stands for no limit
+    '''
+    has_from = limit_from != 0
+    value_covered = np.where(has_from, value - (limit_from - 1), value)
+    value_covered = np.where(
+        (limit_to != 0) & (value > limit_to),
+        value_covered - (value - limit_to),
+        value_covered
+    )
+    value_covered = np.maximum(value_covered, 0)
+    value_covered[has_from & (value < limit_from)] = 0
+    return value_covered
+
+
+def is_applicable(count, limit_from, limit_to, limit_to_is_null, strict_range):
+    return np.where(
+        strict_range,
+        (count >= limit_from) & (limit_to_is_null | (count <= limit_to)),
+        count >= limit_from
+    )
+
+
+def multiply(a, b, overflow):
+    '''
+    Get `a * b`, flagging in `overflow` where that could exceed 64 bits
+    '''
+    overflow |= np.abs(a.astype(np.float64) * b) >= LIMIT
+    return a * b
+
+
+def apply_percent(total, percent, overflow, inexact):
+    '''
+    Get `percent` of `total` exactly, flagging in `inexact` where that
+    isn't a whole number of pence x 10^5
+    '''
+    quotient, remainder = np.divmod(total, PERCENT_DIVISOR)
+    remainder = remainder * percent
+    inexact |= remainder % PERCENT_DIVISOR != 0
+    return multiply(quotient, percent, overflow) + remainder // PERCENT_DIVISOR
+
+
+class CompiledPrices:
+    '''
+    The columns of every price in the price table, and of their modifiers
+    with the modifiers of each price stored contiguously from
+    `modifier_start`
+    '''
+
+    def __init__(self, price_table):
+        prices = [
+            price for key in sorted(price_table.prices)
+            for price in price_table.prices[key]
+        ]
+        self.price_table = price_table
+        self.price_index = {price.pk: i for i, price in enumerate(prices)}
+        self.modifier_type_index = {}
+
+        price_columns = []
+        modifier_columns = []
+        modifier_start = []
+        for price in prices:
+            fixed_fee = to_fixed(price.fixed_fee, SCALE)
+            fee_per_unit = to_fixed(price.fee_per_unit, SCALE)
+            modifiers = list(price.modifiers.all())
+            modifier_start.append(len(modifier_columns))
+            exact = fixed_fee is not None and fee_per_unit is not None
+            for modifier in modifiers:
+                fixed_percent = to_fixed(modifier.fixed_percent, PERCENT_SCALE)
+                percent_per_unit = to_fixed(
+                    modifier.percent_per_unit, PERCENT_SCALE
+                )
+                exact = exact and (
+                    fixed_percent is not None and percent_per_unit is not None
+                )
+                modifier_columns.append((
+                    self.modifier_type_index.setdefault(
+                        modifier.modifier_type_id, len(self.modifier_type_index)
+                    ),
+                    modifier.limit_from,
+                    modifier.limit_to or 0,
+                    modifier.limit_to is None,
+                    modifier.strict_range,
+                    modifier.required,
+                    modifier.priority,
+                    fixed_percent or 0,
+                    percent_per_unit or 0,
+                ))
+            price_columns.append((
+                price.limit_from,
+                price.limit_to or 0,
+                price.limit_to is None,
+                price.strict_range,
+                fixed_fee or 0,
+                fee_per_unit or 0,
+                len(modifiers),
+                exact,
+            ))
+
+        (
+            self.limit_from, self.limit_to, self.limit_to_is_null,
+            self.strict_range, self.fixed_fee, self.fee_per_unit,
+            self.modifier_count, self.exact,
+        ) = self.to_arrays(price_columns, 8, (
+            np.int64, np.int64, bool, bool, np.int64, np.int64, np.int64, bool,
+        ))
+        self.modifier_start = np.array(modifier_start, dtype=np.int64)
+        (
+            self.modifier_type, self.modifier_limit_from,
+            self.modifier_limit_to, self.modifier_limit_to_is_null,
+            self.modifier_strict_range, self.modifier_required,
+            self.modifier_priority, self.modifier_fixed_percent,
+            self.modifier_percent_per_unit,
+        ) = self.to_arrays(modifier_columns, 9, (
+            np.int64, np.int64, np.int64, bool, bool, bool, np.int64,
+            np.int64, np.int64,
+        ))
+
+    @staticmethod
+    def to_arrays(rows, width, dtypes):
+        columns = list(zip(*rows)) or [()] * width
+        return [
+            np.array(column, dtype=dtype)
+            for column, dtype in zip(columns, dtypes)
+        ]
+
+
+@snapshot
+def get_compiled_prices():
+    return CompiledPrices(get_price_table())
+
+
+class Batch:
+    '''
+    The inputs of a batch of calculations, flattened into one row for each
+    unit count ("slot") and one row for each price of each slot ("pair")
+    '''
+
+    def __init__(self, compiled, calculations):
+        self.compiled = compiled
+        self.fallback = np.zeros(len(calculations), dtype=bool)
+        self.is_max = np.zeros(len(calculations), dtype=bool)
+        self.modifier_counts = np.zeros(
+            (len(calculations), max(len(compiled.modifier_type_index), 1)),
+            dtype=np.int64
+        )
+        self.has_modifier_count = np.zeros(
+            self.modifier_counts.shape, dtype=bool
+        )
+
+        price_table = compiled.price_table
+        candidates = {}
+        slot_calculation = []
+        slot_has_prices = []
+        pair_slot = []
+        pair_price = []
+        pair_count = []
+        for i, (
+            scheme, scenario, fee_type, offence_class, advocate_type,
+            unit_counts, modifier_counts
+        ) in enumerate(calculations):
+            self.is_max[i] = fee_type.aggregation == AGGREGATION_TYPE.MAX
+            if not self.add_modifier_counts(i, modifier_counts):
+                self.fallback[i] = True
+                continue
+
+            for unit, unit_count in unit_counts:
+                key = (
+                    get_pk(scheme), get_pk(scenario), get_pk(fee_type),
+                    get_pk(unit), get_pk(advocate_type), get_pk(offence_class),
+                )
+                if key not in candidates:
+                    candidates[key] = [
+                        compiled.price_index[price.pk]
+                        for price in price_table.get_prices(
+                            scheme, scenario, fee_type, unit,
+                            advocate_type=advocate_type,
+                            offence_class=offence_class
+                        )
+                    ]
+                prices = candidates[key]
+                count = to_count(unit_count)
+                if count is None and prices:
+                    self.fallback[i] = True
+                    break
+
+                slot = len(slot_calculation)
+                slot_calculation.append(i)
+                slot_has_prices.append(bool(prices))
+                pair_slot.extend([slot] * len(prices))
+                pair_price.extend(prices)
+                pair_count.extend([count] * len(prices))
+
+        self.slot_calculation = np.array(slot_calculation, dtype=np.int64)
+        self.slot_has_prices = np.array(slot_has_prices, dtype=bool)
+        self.pair_slot = np.array(pair_slot, dtype=np.int64)
+        self.pair_price = np.array(pair_price, dtype=np.int64)
+        self.pair_count = np.array(pair_count, dtype=np.int64)
+
+    def add_modifier_counts(self, i, modifier_counts):
+        '''
+        Record the modifier counts of calculation `i`, returning False if
+        they can't be evaluated exactly
+        '''
+        for modifier_type, count in modifier_counts:
+            column = self.compiled.modifier_type_index.get(modifier_type.pk)
+            if column is None:
+                # no price has modifiers of this type
+                continue
+            count = to_count(count)
+            if count is None or self.has_modifier_count[i, column]:
+                return False
+            self.modifier_counts[i, column] = count
+            self.has_modifier_count[i, column] = True
+        return True
+
+
+def calculate_pair_totals(batch):
+    '''
+    Get the total of each price of each slot, along with whether it could
+    be calculated exactly
+    '''
+    compiled = batch.compiled
+    price = batch.pair_price
+    count = batch.pair_count
+    overflow = np.zeros(len(price), dtype=bool)
+    inexact = ~compiled.exact[price]
+
+    applicable = is_applicable(
+        count, compiled.limit_from[price], compiled.limit_to[price],
+        compiled.limit_to_is_null[price], compiled.strict_range[price]
+    )
+    covered = get_value_covered_by_range(
+        count, compiled.limit_from[price], compiled.limit_to[price]
+    )
+    fixed_fee = compiled.fixed_fee[price]
+    # first unit is included in any fixed fee with a strict range
+    covered = covered - ((fixed_fee != 0) & compiled.strict_range[price])
+    total = fixed_fee + multiply(covered, compiled.fee_per_unit[price], overflow)
+
+    # one row for each modifier of each price of each slot
+    modifier_count = compiled.modifier_count[price]
+    row_pair = np.repeat(np.arange(len(price)), modifier_count)
+    row_offset = np.arange(len(row_pair)) - np.repeat(
+        np.cumsum(modifier_count) - modifier_count, modifier_count
+    )
+    modifier = compiled.modifier_start[price][row_pair] + row_offset
+    calculation = batch.slot_calculation[batch.pair_slot[row_pair]]
+    modifier_type = compiled.modifier_type[modifier]
+    row_count = batch.modifier_counts[calculation, modifier_type]
+
+    row_applicable = batch.has_modifier_count[calculation, modifier_type] & (
+        is_applicable(
+            row_count, compiled.modifier_limit_from[modifier],
+            compiled.modifier_limit_to[modifier],
+            compiled.modifier_limit_to_is_null[modifier],
+            compiled.modifier_strict_range[modifier]
+        )
+    )
+    missing = compiled.modifier_required[modifier] & ~row_applicable
+    applicable[row_pair[missing]] = False
+    row_covered = get_value_covered_by_range(
+        row_count, compiled.modifier_limit_from[modifier],
+        compiled.modifier_limit_to[modifier]
+    )
+
+    priority = compiled.modifier_priority[modifier]
+    for level in np.unique(priority[row_applicable]):
+        rows = row_applicable & (priority == level)
+        pairs = row_pair[rows]
+        row_total = total[pairs]
+        row_overflow = np.zeros(len(pairs), dtype=bool)
+        row_inexact = np.zeros(len(pairs), dtype=bool)
+        fees = apply_percent(
+            row_total, compiled.modifier_fixed_percent[modifier[rows]],
+            row_overflow, row_inexact
+        ) + multiply(
+            apply_percent(
+                row_total, compiled.modifier_percent_per_unit[modifier[rows]],
+                row_overflow, row_inexact
+            ),
+            row_covered[rows], row_overflow
+        )
+        np.add.at(total, pairs, fees)
+        overflow[pairs[row_overflow]] = True
+        inexact[pairs[row_inexact]] = True
+        overflow |= np.abs(total.astype(np.float64)) >= LIMIT
+
+    return np.where(applicable, total, 0), overflow | inexact
+
+
+def calculate_totals(calculations):
+    '''
+    Get the result of `calculate_total(*calculation)` for each of
+    `calculations`
+    '''
+    calculations = list(calculations)
+    if np is None:
+        return [calculate_total(*calculation) for calculation in calculations]
+
+    batch = Batch(get_compiled_prices(), calculations)
+    pair_totals, pair_fallback = calculate_pair_totals(batch)
+
+    slot_totals = np.zeros(len(batch.slot_calculation), dtype=np.int64)
+    np.add.at(slot_totals, batch.pair_slot, pair_totals)
+    slot_fallback = np.zeros(len(batch.slot_calculation), dtype=bool)
+    slot_fallback[batch.pair_slot[pair_fallback]] = True
+    batch.fallback[batch.slot_calculation[slot_fallback]] = True
+
+    # only slots with prices are aggregated
+    slots = batch.slot_has_prices
+    slot_calculation = batch.slot_calculation[slots]
+    slot_totals = slot_totals[slots]
+    sums = np.zeros(len(calculations), dtype=np.int64)
+    np.add.at(sums, slot_calculation, slot_totals)
+    magnitudes = np.zeros(len(calculations), dtype=np.float64)
+    np.add.at(magnitudes, slot_calculation, np.abs(slot_totals))
+    batch.fallback |= magnitudes >= LIMIT
+    maxima = np.full(len(calculations), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(maxima, slot_calculation, slot_totals)
+    has_prices = np.zeros(len(calculations), dtype=bool)
+    has_prices[slot_calculation] = True
+    totals = np.where(
+        has_prices, np.where(batch.is_max, maxima, sums), 0
+    )
+
+    return [
+        calculate_total(*calculation) if fallback
+        else Decimal(int(total)).scaleb(-7)
+        for calculation, total, fallback in zip(
+            calculations, totals, batch.fallback
+        )
+    ]
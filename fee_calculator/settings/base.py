@@ -100,6 +100,47 @@ DATABASES = {
     }
 }
 
+# a server database, e.g. Postgres, is used in place of sqlite if `DB_ENGINE`
+# is set; the image's sqlite database is migrated and loaded at build time but
+# a server database must be migrated and loaded before it is used
+if os.environ.get('DB_ENGINE'):
+    DATABASES['default'] = {
+        'ENGINE': os.environ['DB_ENGINE'],
+        'NAME': os.environ.get('DB_NAME', ''),
+        'USER': os.environ.get('DB_USERNAME', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        # seconds for which each worker thread keeps its connection open
+        # between requests; 0 closes it after every request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 300)),
+        # required when connecting through a transaction pooler such as PgBouncer
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_POOLED', 'False') == 'True',
+    }
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['default']['OPTIONS'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        }
+
+# pragmas run on each new connection to a sqlite database
+SQLITE_PRAGMAS = {}
+
+# serve the sqlite database, prepared with the `compactdatabase` command, as a
+# read-only snapshot that is never locked and can be shared by all processes
+DB_SNAPSHOT = os.environ.get('DB_SNAPSHOT', 'False') == 'True'
+if DB_SNAPSHOT and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['NAME'] = 'file:{path}?mode=ro&immutable=1'.format(
+        path=DATABASES['default']['NAME']
+    )
+    # the data never changes, so each thread can keep its connection
+    DATABASES['default']['CONN_MAX_AGE'] = None
+    SQLITE_PRAGMAS = {
+        'query_only': 1,
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # a negative size is in KiB rather than pages
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators
@@ -181,6 +222,21 @@ REST_FRAMEWORK = {
 
 API_VERSION = 'v1'
 
+# maximum number of calculations accepted by a single batch request
+CALCULATOR_BATCH_LIMIT = int(os.environ.get('CALCULATOR_BATCH_LIMIT', 1000))
+
+# seconds between checks for scheme data changed by another process
+DATA_VERSION_CHECK_INTERVAL = int(os.environ.get('DATA_VERSION_CHECK_INTERVAL', 60))
+
+# seconds for which clients may cache responses derived from scheme data
+DATA_CACHE_MAX_AGE = int(os.environ.get('DATA_CACHE_MAX_AGE', 60))
+
+# in-memory cache of calculation results; a size of 0 disables the cache
+CALCULATION_CACHE_SIZE = int(os.environ.get('CALCULATION_CACHE_SIZE', 10000))
+CALCULATION_CACHE_TTL = int(os.environ.get('CALCULATION_CACHE_TTL', 3600))
+# optional name of one of `CACHES` through which results are shared between processes
+CALCULATION_CACHE_ALIAS = os.environ.get('CALCULATION_CACHE_ALIAS')
+
 
 SWAGGER_SETTINGS = {
     'APIS_SORTER': 'alpha'
@@ -207,6 +263,14 @@ USE_TZ = True
 STATIC_ROOT = location('static')
 STATIC_URL = '/static/'
 
+# the OpenAPI document prebuilt by the `buildopenapi` command, which the docs
+# endpoint serves if it was built from the current scheme data
+OPENAPI_DOCUMENT_PATH = os.environ.get(
+    'OPENAPI_DOCUMENT_PATH', os.path.join(STATIC_ROOT, 'openapi.json')
+)
+# seconds for which clients may cache the OpenAPI document
+OPENAPI_CACHE_MAX_AGE = int(os.environ.get('OPENAPI_CACHE_MAX_AGE', 86400))
+
 PING_JSON_KEYS = {
     'build_date_key': 'APP_BUILD_DATE',
     'commit_id_key': 'APP_GIT_COMMIT',
@@ -215,7 +279,7 @@ PING_JSON_KEYS = {
 }
 
 HEALTHCHECKS = [
-    'moj_irat.healthchecks.database_healthcheck',
+    'calculator.healthchecks.database_healthcheck',
 ]
 
 AUTODISCOVER_HEALTHCHECKS = True
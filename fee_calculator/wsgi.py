@@ -14,3 +14,17 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fee_calculator.settings")
 
 application = get_wsgi_application()
+
+try:
+    from uwsgidecorators import postfork
+except ImportError:
+    # not running under uWSGI
+    postfork = None
+
+if postfork:
+    @postfork
+    def close_database_connections():
+        # uWSGI loads the application in the master process before forking
+        # the workers, which mustn't share any connection it opened
+        from django.db import connections
+        connections.close_all()